@@ -1,3 +1,13 @@
 from FiniteAutomata.fa.dfa import DFA
 from FiniteAutomata.fa.nfa import NFA
-
+from FiniteAutomata.fa.compiled import CompiledDFA
+from FiniteAutomata.fa.lazy_dfa import LazyDFA
+from FiniteAutomata.fa.bit_nfa import BitNFA
+from FiniteAutomata.fa.cache import AutomataCache, automata_cache
+from FiniteAutomata.fa.matcher import Matcher, DFAMatcher, NFAMatcher, match_file
+from FiniteAutomata.fa.stream import match_stream
+from FiniteAutomata.fa.search import Searcher
+from FiniteAutomata.fa.parallel import MatcherPool
+from FiniteAutomata.fa.pattern_set import PatternSet
+from FiniteAutomata.fa.instrumentation import Recorder, add_hook, remove_hook
+from FiniteAutomata.fa.guard import build_matcher
@@ -13,3 +13,13 @@ class DFAInvalidArgumentsException(Exception):
     """The DFA arguments are not valid."""
 
     pass
+
+class InvalidAutomatonFileException(Exception):
+    """The automaton file is not valid."""
+
+    pass
+
+class StateExplosionException(Exception):
+    """The automaton construction exceeded its states, memory or time budget."""
+
+    pass
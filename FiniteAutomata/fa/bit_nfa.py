@@ -0,0 +1,258 @@
+from typing import Dict, Iterable, Set, Tuple, TypeVar
+from FiniteAutomata.fa.instrumentation import emit, hooks
+
+
+BitNFA = TypeVar('BitNFA')
+
+
+def epsilon_closures(transitions_table: Dict[str, Dict[str, Set[str]]], bits: Dict[str, int]) -> Dict[str, int]:
+    """
+    Return the bitmask of the epsilon closure of every state.
+    The cycles of epsilon transitions are collapsed by Tarjan's algorithm, which finishes a component after the components it reaches,
+    so the closure of a component is its own bits or the closures already found, linear in the transitions plus one int or per transition.
+    transitions_table: NFA transitions, '$' is the epsilon symbol
+    transitions_table type: dict
+    bits: the bit of every state
+    bits type: dict
+    """
+    closures = {}
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    for root in transitions_table:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(transitions_table[root].get('$', ())))]
+        while work:
+            state, targets = work[-1]
+            for target in targets:
+                if target not in index:
+                    index[target] = low[target] = len(index)
+                    stack.append(target)
+                    on_stack.add(target)
+                    work.append(
+                        (target, iter(transitions_table[target].get('$', ()))))
+                    break
+                if target in on_stack:
+                    low[state] = min(low[state], index[target])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[state])
+                if low[state] == index[state]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == state:
+                            break
+                    # The members of other components are finished, those of this one are added by their own bit.
+                    closure = 0
+                    for member in component:
+                        closure |= 1 << bits[member]
+                        for target in transitions_table[member].get('$', ()):
+                            closure |= closures.get(target, 0)
+                    for member in component:
+                        closures[member] = closure
+    return closures
+
+
+class BitNFA:
+    """Immutable NFA simulation over integer states, where a set of states is an int bitmask."""
+
+    def __init__(self, *, transitions_table: Dict[str, Dict[str, Set[str]]], start_state: str, final_states: Iterable[str]) -> None:
+        """
+        transitions_table: NFA transitions, '$' is the epsilon symbol
+        transitions_table type: dict
+        start_state: the start state
+        start_state type: str
+        final_states: the final states
+        final_states type: iterable of str
+        """
+        # States with an edge on some symbol get the low bits, grouped by symbol,
+        # so the bits a symbol reads fall into as few chunks as possible.
+        sources = {}
+        for state, transitions in transitions_table.items():
+            for symbol, statesTo in transitions.items():
+                if symbol != '$' and statesTo:
+                    sources.setdefault(symbol, []).append(state)
+        states = list(dict.fromkeys(
+            state for symbol in sorted(sources) for state in sources[symbol]))
+        grouped = set(states)
+        self._symbols_mask = (1 << len(states)) - 1
+        states.extend(
+            state for state in transitions_table if state not in grouped)
+        self._states = tuple(states)
+        self._bits = {state: bit for bit, state in enumerate(self._states)}
+
+        closures = epsilon_closures(transitions_table, self._bits)
+
+        self._chunk_bits = 8 if len(states) <= 2048 else 4
+        chunk_size = 1 << self._chunk_bits
+        self._chunks = {}
+        for symbol, statesFrom in sources.items():
+            successors = {}
+            for stateFrom in statesFrom:
+                mask = 0
+                for stateTo in transitions_table[stateFrom][symbol]:
+                    mask |= closures[stateTo]
+                successors[self._bits[stateFrom]] = mask
+
+            chunks = []
+            for shift in sorted({bit - bit % self._chunk_bits for bit in successors}):
+                # table[v] is the union of the successors of the states whose bits are set in v.
+                table = [0] * chunk_size
+                for value in range(1, chunk_size):
+                    low = value & -value
+                    table[value] = table[value ^ low] | successors.get(
+                        shift + low.bit_length() - 1, 0)
+                chunks.append((shift, tuple(table)))
+            self._chunks[symbol] = tuple(chunks)
+
+        self._start = closures[start_state]
+        self._final = self.from_states(final_states)
+
+    @classmethod
+    def from_nfa(cls, nfa) -> BitNFA:
+        """
+        Return a bit-parallel simulation of the nfa.
+        nfa: the nfa that will be simulated
+        nfa type: NFA
+        """
+        return cls(transitions_table=nfa.transitions_table, start_state=nfa.start_state, final_states=nfa.final_states)
+
+    def __repr__(self) -> str:
+        return f"BitNFA(states={len(self._states)}, symbols={len(self._chunks)})"
+
+    @property
+    def states(self) -> Tuple[str, ...]:
+        """States names, the state of bit i is states[i]."""
+        return self._states
+
+    @property
+    def start_mask(self) -> int:
+        return self._start
+
+    @property
+    def final_mask(self) -> int:
+        return self._final
+
+    @property
+    def symbols_mask(self) -> int:
+        """The bitmask of the states with a transition on some symbol."""
+        return self._symbols_mask
+
+    def from_states(self, states: Iterable[str]) -> int:
+        """Return the bitmask of a set of states."""
+        mask = 0
+        for state in states:
+            mask |= 1 << self._bits[state]
+        return mask
+
+    def to_states(self, mask: int) -> Set[str]:
+        """Return the set of states of a bitmask."""
+        states = set()
+        while mask:
+            low = mask & -mask
+            states.add(self._states[low.bit_length() - 1])
+            mask ^= low
+        return states
+
+    def step(self, mask: int, symbol: str) -> int:
+        """Return the states reached from mask by reading symbol and following epsilon transitions."""
+        next_mask = 0
+        chunk_mask = (1 << self._chunk_bits) - 1
+        for shift, table in self._chunks.get(symbol, ()):
+            next_mask |= table[(mask >> shift) & chunk_mask]
+        return next_mask
+
+    def run(self, mask: int, input: str) -> int:
+        """Return the states reached from mask by reading the input."""
+        chunks = self._chunks
+        chunk_mask = (1 << self._chunk_bits) - 1
+        for c in input:
+            if not mask:
+                break
+            next_mask = 0
+            for shift, table in chunks.get(c, ()):
+                next_mask |= table[(mask >> shift) & chunk_mask]
+            mask = next_mask
+        return mask
+
+    def run_until_final(self, mask: int, input: str) -> Tuple[int, int]:
+        """Return the states reached from mask by reading the input up to the first final state, and the number of symbols read."""
+        chunks = self._chunks
+        chunk_mask = (1 << self._chunk_bits) - 1
+        for read, c in enumerate(input, 1):
+            next_mask = 0
+            for shift, table in chunks.get(c, ()):
+                next_mask |= table[(mask >> shift) & chunk_mask]
+            mask = next_mask
+            if mask & self._final:
+                return mask, read
+        return mask, len(input)
+
+    def longest_match(self, input: str, start: int = 0, explored: Dict[Tuple[int, int], int] = None) -> int:
+        """
+        Return the end of the longest accepted prefix of input[start:], -1 if no prefix is accepted.
+        Reading stops once no state is active.
+        input: the string that will be read
+        input type: str
+        start: the index of input the prefix starts at
+        start type: int
+        explored: shared by the calls on one input at growing starts, it keeps the end found from every (position, mask) pair read
+                  past a match, and reading stops at a kept pair, so every pair is read once in all the calls
+        explored type: dict
+        """
+        chunks = self._chunks
+        chunk_mask = (1 << self._chunk_bits) - 1
+        final = self._final
+        mask = self._start
+        end = start if mask & final else -1
+        hit = -1
+        path = []
+        for position in range(start, len(input)):
+            next_mask = 0
+            for shift, table in chunks.get(input[position], ()):
+                next_mask |= table[(mask >> shift) & chunk_mask]
+            mask = next_mask
+            if not mask:
+                break
+            if explored is not None:
+                hit = explored.get((position + 1, mask), -2)
+                if hit != -2:
+                    break
+                path.append((position + 1, mask))
+            if mask & final:
+                end = position + 1
+        if hit >= 0:
+            end = hit
+        # Like CompiledDFA.longest_match, the end found from a pair is the last accepting pair from it on.
+        best = max(hit, -1)
+        for position, mask in reversed(path):
+            if best == -1 and mask & final:
+                best = position
+            if position >= end:
+                explored[position, mask] = best
+        return end
+
+    def check_string(self, input: str) -> Tuple[bool, Set[str]]:
+        """
+        Return True if the input is accepted, and last states the input reaches
+        input: the string that will be checked
+        input type: str
+        """
+        if not isinstance(input, str):
+            raise TypeError(
+                f"input has to be a str. {input} is {type(input)}, not str.")
+        mask = self.run(self._start, input)
+        if hooks:
+            emit('match', engine='nfa', steps=len(input),
+                 accepted=mask & self._final != 0, dead=mask == 0)
+        return mask & self._final != 0, self.to_states(mask)
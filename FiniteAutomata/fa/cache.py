@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict, namedtuple
+from typing import Callable, Union
+from FiniteAutomata.fa.compiled import CompiledDFA
+from FiniteAutomata.fa.dfa import DFA
+from FiniteAutomata.fa.nfa import NFA
+
+
+CacheInfo = namedtuple(
+    'CacheInfo', ['hits', 'misses', 'maxsize', 'currsize', 'states'])
+
+
+class AutomataCache:
+    """Thread-safe LRU cache of the automata built from regexes, keyed by the normalized regex."""
+
+    def __init__(self, *, maxsize: int = 256, max_states: int = None) -> None:
+        """
+        maxsize: the most automata kept in the cache
+        maxsize type: int
+        max_states: the most states of all the cached automata together, None for no limit
+        max_states type: int
+        """
+        if maxsize < 1:
+            raise ValueError(
+                f"maxsize has to be at least 1. {maxsize} is not.")
+        self.maxsize = maxsize
+        self.max_states = max_states
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop every cached automaton and reset the cache statistics."""
+        with self._lock:
+            self._cache = OrderedDict()
+            self._states = 0
+            self._hits = 0
+            self._misses = 0
+
+    def cache_info(self) -> CacheInfo:
+        """Return the cache statistics."""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.maxsize, len(self._cache), self._states)
+
+    def _get(self, kind: str, regex: str, build: Callable) -> Union[NFA, DFA, CompiledDFA]:
+        if not isinstance(regex, str):
+            raise TypeError(
+                f"regex has to be a str. {regex} is {type(regex)}, not str.")
+        key = (kind, NFA.normalize_regex(regex))
+        with self._lock:
+            automaton = self._cache.get(key)
+            if automaton is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return automaton
+            self._misses += 1
+
+        # Built without holding the lock, if two threads build the same automaton the first one is kept.
+        automaton = build(key[1])
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+            self._cache[key] = automaton
+            self._states += len(automaton.states)
+            while len(self._cache) > self.maxsize or (self.max_states is not None and self._states > self.max_states and len(self._cache) > 1):
+                _, evicted = self._cache.popitem(last=False)
+                self._states -= len(evicted.states)
+        return automaton
+
+    def nfa(self, regex: str) -> NFA:
+        """
+        Return the shared NFA of the regex, it must not be modified.
+        regex: the regex of the nfa
+        regex type: str
+        """
+        return self._get('nfa', regex, NFA)
+
+    def dfa(self, regex: str) -> DFA:
+        """
+        Return the shared minimized DFA of the regex, it must not be modified.
+        regex: the regex of the dfa
+        regex type: str
+        """
+        return self._get('dfa', regex, lambda regex: DFA(nfa=self.nfa(regex)).minimize())
+
+    def compile(self, regex: str) -> CompiledDFA:
+        """
+        Return the shared compiled matcher of the regex's minimized DFA.
+        regex: the regex of the matcher
+        regex type: str
+        """
+        return self._get('compiled', regex, lambda regex: self.dfa(regex).compile())
+
+
+automata_cache = AutomataCache()
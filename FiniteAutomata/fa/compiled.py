@@ -0,0 +1,413 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from time import perf_counter
+from typing import Dict, FrozenSet, Iterable, List, Sequence, Tuple, TypeVar, Union
+import numpy as np
+from FiniteAutomata.exceptions.Exceptions import *
+from FiniteAutomata.fa.instrumentation import emit, hooks
+
+
+CompiledDFA = TypeVar('CompiledDFA')
+
+# magic, version, states, symbols, start row, size of the symbols section, size of the states names section
+_HEADER = struct.Struct('<6sHIIIII')
+_MAGIC = b'FADFA\x00'
+# Version 2 stores the symbols of a column as one string, version 1 had one symbol per column.
+_VERSION = 2
+
+
+def _pack_strings(strings: Iterable[str]) -> bytes:
+    packed = bytearray()
+    for string in strings:
+        encoded = string.encode('utf-8')
+        packed += struct.pack('<I', len(encoded)) + encoded
+    return bytes(packed)
+
+
+def _unpack_strings(packed: bytes, count: int) -> List[str]:
+    strings = []
+    position = 0
+    for _ in range(count):
+        size, = struct.unpack_from('<I', packed, position)
+        strings.append(packed[position + 4:position + 4 + size].decode('utf-8'))
+        position += 4 + size
+    if position != len(packed):
+        raise InvalidAutomatonFileException(
+            "the strings section size does not match its content")
+    return strings
+
+
+def symbol_columns(transitions_table: Dict[str, Dict[str, str]], symbols: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    Return the symbols grouped by their column of the DFA transitions table, symbols are in the same group if they
+    lead every state to the same state. Each group is keyed by its smallest symbol, in the order of the keys.
+    transitions_table: DFA transitions
+    transitions_table type: dict
+    symbols: the symbols of the DFA
+    symbols type: iterable of str
+    """
+    rows = list(transitions_table.values())
+    columns = {}
+    groups = {}
+    for symbol in sorted(symbols):
+        column = tuple(row[symbol] for row in rows)
+        groups.setdefault(columns.setdefault(column, symbol), []).append(symbol)
+    return groups
+
+
+class CompiledDFA:
+    """Immutable DFA matcher backed by dense integer states and one flat transition array."""
+
+    __slots__ = ('_states', '_columns', '_translation', '_width', '_table', '_start', '_accepting', '_dead', '_steps')
+
+    def __init__(self, *, states: Tuple[str, ...], columns: Dict[str, int], table: Iterable[int], start: int, accepting: Iterable[int]) -> None:
+        """
+        states: names of the states, indexed by their row number
+        states type: tuple of str
+        columns: maps every symbol to its column in the transition table
+        columns type: dict
+        table: row-major transition table, each entry is the row number of the next state
+        table type: iterable of int
+        start: row number of the start state
+        start type: int
+        accepting: one flag per row, nonzero if the state is a final state
+        accepting type: iterable of int
+        """
+        width = max(columns.values(), default=0) + 1
+        if not columns:
+            # Without symbols every row keeps one column that no symbol reads, leading back to its own row,
+            # so rows stay apart once premultiplied.
+            table = range(len(states))
+        # Entries are stored premultiplied by the row width, so a step is a single add and index,
+        # and every entry of a row points to one shared int object per state.
+        offsets = list(range(0, len(states) * width, width))
+        self._initialize(states, columns, tuple(offsets[state] for state in table), offsets[start],
+                         bytes(1 if flag else 0 for flag in accepting))
+
+    def _initialize(self, states: Tuple[str, ...], columns: Dict[str, int], table: Sequence[int], start: int, accepting: bytes) -> None:
+        """Set the matcher from a table of premultiplied entries, a tuple or a memoryview of a mapped file."""
+        self._states = tuple(states)
+        self._columns = dict(columns)
+        self._width = max(self._columns.values(), default=0) + 1
+        self._table = table
+        self._start = start
+        self._accepting = accepting
+        self._dead = None
+        self._steps = None
+        self._translation = None
+        if self._width < 127:
+            # Maps symbols to their column as an ASCII character and the other ASCII characters
+            # to DEL, so the input can be encoded and validated in C-level passes.
+            self._translation = {ord(symbol): chr(column) for symbol,
+                                 column in self._columns.items()}
+            for code in range(128):
+                self._translation.setdefault(code, '\x7f')
+
+    @classmethod
+    def from_dfa(cls, dfa) -> CompiledDFA:
+        """
+        Return a compiled matcher with the same language and state names as the dfa.
+        dfa: the dfa that will be compiled
+        dfa type: DFA
+        """
+        instrumented = bool(hooks)
+        if instrumented:
+            start = perf_counter()
+        states = tuple(dfa.states)
+        index = {state: row for row, state in enumerate(states)}
+        # Symbols with the same transitions from every state share a column.
+        groups = symbol_columns(dfa.transitions_table, dfa.symbols)
+        columns = {symbol: column for column, group in enumerate(groups.values()) for symbol in group}
+        table = [index[dfa.transitions_table[state][symbol]]
+                 for state in states for symbol in groups]
+        compiled = cls(states=states, columns=columns, table=table, start=index[dfa.start_state],
+                       accepting=[state in dfa.final_states for state in states])
+        if instrumented:
+            emit('compile', seconds=perf_counter() - start,
+                 states=len(states), table_bytes=compiled.nbytes)
+        return compiled
+
+    def __repr__(self) -> str:
+        return f"CompiledDFA(states={len(self._states)}, symbols={len(self._columns)})"
+
+    @property
+    def states(self) -> Tuple[str, ...]:
+        return self._states
+
+    @property
+    def symbols(self) -> Tuple[str, ...]:
+        return tuple(self._columns)
+
+    @property
+    def start_state(self) -> str:
+        return self._states[self._start // self._width]
+
+    @property
+    def start_row(self) -> int:
+        return self._start // self._width
+
+    @property
+    def final_states(self) -> FrozenSet[str]:
+        return frozenset(state for state, flag in zip(self._states, self._accepting) if flag)
+
+    @property
+    def nbytes(self) -> int:
+        """Size in bytes of the transition table, its state offsets and the accept flags."""
+        if isinstance(self._table, memoryview):
+            return self._table.nbytes + len(self._accepting)
+        return sys.getsizeof(self._table) + sum(map(sys.getsizeof, set(self._table))) + len(self._accepting)
+
+    def _encode(self, input: str) -> Iterable[int]:
+        """Return the columns of the input symbols, raise KeyError for an unknown symbol."""
+        if self._translation is None:
+            return map(self._columns.__getitem__, input)
+        try:
+            columns = input.translate(self._translation).encode('latin-1')
+        except UnicodeEncodeError:
+            columns = b'\x7f'
+        if b'\x7f' in columns or not columns.isascii():
+            for c in input:
+                self._columns[c]
+        return columns
+
+    def _run(self, state: int, input: str) -> int:
+        table = self._table
+        for column in self._encode(input):
+            state = table[state + column]
+        return state
+
+    def run(self, row: int, input: str) -> int:
+        """
+        Return the row of the state reached from the state of row by reading the input.
+        row: the row of the state the input starts from
+        row type: int
+        input: the string that will be read
+        input type: str
+        """
+        return self._run(row * self._width, input) // self._width
+
+    def is_final(self, row: int) -> bool:
+        """Return True if the state of row is a final state."""
+        return self._accepting[row] == 1
+
+    def _dead_rows(self) -> bytes:
+        """Return one flag per row, 1 if no final state can be reached from the state."""
+        if self._dead is None:
+            predecessors = [[] for _ in self._states]
+            for position, offset in enumerate(self._table):
+                predecessors[offset // self._width].append(
+                    position // self._width)
+            live = {row for row, flag in enumerate(self._accepting) if flag}
+            stack = list(live)
+            while stack:
+                for row in predecessors[stack.pop()]:
+                    if row not in live:
+                        live.add(row)
+                        stack.append(row)
+            self._dead = bytes(
+                row not in live for row in range(len(self._states)))
+        return self._dead
+
+    def is_dead(self, row: int) -> bool:
+        """Return True if no final state can be reached from the state of row."""
+        return self._dead_rows()[row] == 1
+
+    def run_until_final(self, row: int, input: str) -> Tuple[int, int]:
+        """
+        Return the row of the state reached from the state of row by reading the input up to the first final state,
+        and the number of symbols read, len(input) if no final state is reached.
+        The symbols are checked as they are read, so the symbols after the final state are not, raise KeyError for an unknown symbol before it.
+        row: the row of the state the input starts from
+        row type: int
+        input: the string that will be read
+        input type: str
+        """
+        table, columns, width, accepting = self._table, self._columns, self._width, self._accepting
+        state = row * width
+        for read, c in enumerate(input, 1):
+            state = table[state + columns[c]]
+            if accepting[state // width]:
+                return state // width, read
+        return state // width, len(input)
+
+    def longest_match(self, input: str, start: int = 0, explored: Dict[Tuple[int, int], int] = None) -> int:
+        """
+        Return the end of the longest accepted prefix of input[start:], -1 if no prefix is accepted.
+        Reading stops at the first symbol outside the alphabet, or once no final state can be reached.
+        input: the string that will be read
+        input type: str
+        start: the index of input the prefix starts at
+        start type: int
+        explored: shared by the calls on one input at growing starts, it keeps the end found from every (position, state) pair read
+                  past a match, and reading stops at a kept pair, so every pair is read once in all the calls
+        explored type: dict
+        """
+        table, columns, width = self._table, self._columns, self._width
+        accepting, dead = self._accepting, self._dead_rows()
+        state = self._start
+        end = start if accepting[state // width] else -1
+        hit = -1
+        path = []
+        for position in range(start, len(input)):
+            column = columns.get(input[position])
+            if column is None:
+                break
+            state = table[state + column]
+            row = state // width
+            if dead[row]:
+                break
+            if explored is not None:
+                hit = explored.get((position + 1, state), -2)
+                if hit != -2:
+                    break
+                path.append((position + 1, state))
+            if accepting[row]:
+                end = position + 1
+        if hit >= 0:
+            end = hit
+        # The future of a pair does not depend on how it was reached, so the end found from it is the last accepting pair from it on.
+        # Later calls start at end or after it, the pairs before end are not kept.
+        best = max(hit, -1)
+        for position, state in reversed(path):
+            if best == -1 and accepting[state // width]:
+                best = position
+            if position >= end:
+                explored[position, state] = best
+        return end
+
+    def match(self, input: str) -> Tuple[bool, str]:
+        """
+        Return True if the input is accepted, and last state the input reaches.
+        input: the string that will be checked
+        input type: str
+        """
+        if not isinstance(input, str):
+            raise TypeError(
+                f"input has to be a str. {input} is {type(input)}, not str.")
+        row = self._run(self._start, input) // self._width
+        if hooks:
+            emit('match', engine='compiled', steps=len(input),
+                 accepted=self._accepting[row] == 1, dead=self.is_dead(row))
+        return self._accepting[row] == 1, self._states[row]
+
+    def _transition_matrix(self) -> np.ndarray:
+        """Return the transition table as a (states, symbols) array of row numbers."""
+        if self._steps is None:
+            steps = np.array(self._table, dtype=np.intp) // max(self._width, 1)
+            self._steps = steps.reshape(len(self._states), self._width)
+        return self._steps
+
+    def check_many(self, strings: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return a boolean array that is True where the string is accepted, and the array of the last states the strings reach.
+        Every string advances through the transition table at once, one symbol position at a time.
+        The last states are row numbers, their names are matcher.states[row].
+        strings: the strings that will be checked
+        strings type: iterable of str
+        """
+        strings = list(strings)
+        for input in strings:
+            if not isinstance(input, str):
+                raise TypeError(
+                    f"input has to be a str. {input} is {type(input)}, not str.")
+        steps = self._transition_matrix()
+        lengths = np.fromiter(map(len, strings), dtype=np.intp, count=len(strings))
+        columns = self._encode(''.join(strings))
+        if isinstance(columns, bytes):
+            columns = np.frombuffer(columns, dtype=np.uint8)
+        else:
+            columns = np.fromiter(columns, dtype=np.intp, count=int(lengths.sum()))
+
+        # Longest strings first, so at position j only a prefix of the batch is still running.
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.intp)
+        order = np.argsort(-lengths, kind='stable')
+        starts = starts[order]
+        running = np.searchsorted(-lengths[order], -np.arange(lengths.max(initial=0)))
+
+        states = np.full(len(strings), self.start_row, dtype=np.intp)
+        for position, active in enumerate(running):
+            states[:active] = steps[states[:active], columns[starts[:active] + position]]
+
+        final_states = np.empty_like(states)
+        final_states[order] = states
+        accepting = np.frombuffer(self._accepting, dtype=np.uint8).astype(bool)
+        return accepting[final_states], final_states
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Write the matcher to a file, in a versioned binary format:
+        a header, the symbols of every column in column order, the states names, the transition table as little-endian int32 and the accept bitmap.
+        path: the path of the file
+        path type: str or os.PathLike
+        """
+        groups = [[] for _ in range(self._width)]
+        for symbol, column in self._columns.items():
+            groups[column].append(symbol)
+        symbols = _pack_strings(''.join(sorted(group)) for group in groups)
+        states = _pack_strings(self._states)
+        header = _HEADER.pack(_MAGIC, _VERSION, len(self._states), self._width,
+                              self.start_row, len(symbols), len(states))
+        # The table is aligned to 4 bytes, so it can be mapped as int32 in place.
+        padding = bytes(-(len(header) + len(symbols) + len(states)) % 4)
+        table = array('i', self._table)
+        if sys.byteorder == 'big':
+            table.byteswap()
+        bitmap = bytearray((len(self._states) + 7) // 8)
+        for row, flag in enumerate(self._accepting):
+            if flag:
+                bitmap[row // 8] |= 1 << (row % 8)
+        with open(path, 'wb') as file:
+            for section in (header, symbols, states, padding, table, bitmap):
+                file.write(section)
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> CompiledDFA:
+        """
+        Return the matcher saved in a file. The file is memory-mapped read-only and the transition table is used in place,
+        so processes that load the same file share one copy of it.
+        path: the path of the file
+        path type: str or os.PathLike
+        """
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size < _HEADER.size:
+                raise InvalidAutomatonFileException(
+                    f"{path} is too small to be an automaton file")
+            content = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, states_count, width, start, symbols_size, states_size = _HEADER.unpack_from(
+            content)
+        if magic != _MAGIC:
+            raise InvalidAutomatonFileException(
+                f"{path} is not an automaton file")
+        if version not in (1, _VERSION):
+            raise InvalidAutomatonFileException(
+                f"{path} has version {version}, only versions 1 to {_VERSION} are supported")
+        symbols_start = _HEADER.size
+        states_start = symbols_start + symbols_size
+        table_start = states_start + states_size
+        table_start += -table_start % 4
+        bitmap_start = table_start + 4 * states_count * width
+        if len(content) != bitmap_start + (states_count + 7) // 8 or start >= max(states_count, 1):
+            raise InvalidAutomatonFileException(
+                f"{path} size does not match its header")
+
+        symbols = _unpack_strings(
+            content[symbols_start:states_start], width)
+        states = _unpack_strings(
+            content[states_start:states_start + states_size], states_count)
+        table = memoryview(content)[table_start:bitmap_start].cast('i')
+        if sys.byteorder == 'big':
+            table = array('i', table)
+            table.byteswap()
+            table = tuple(table)
+        bitmap = content[bitmap_start:]
+        accepting = bytes((bitmap[row // 8] >> (row % 8)) & 1
+                          for row in range(states_count))
+
+        compiled = cls.__new__(cls)
+        compiled._initialize(states, {symbol: column for column, group in enumerate(symbols) for symbol in group},
+                             table, start * width, accepting)
+        return compiled
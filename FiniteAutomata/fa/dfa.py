@@ -1,51 +1,131 @@
-import copy
-from typing import Tuple, TypeVar
-from AlgebraicExpressionParser import Expression
+import asyncio
+import os
+import sys
+from concurrent.futures import Executor
+from time import perf_counter
+from types import MappingProxyType
+from typing import AsyncIterable, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, TextIO, Tuple, TypeVar, Union
+import numpy as np
 from FiniteAutomata.exceptions.Exceptions import *
+from FiniteAutomata.fa.compiled import CompiledDFA, symbol_columns
+from FiniteAutomata.fa.equivalence import dfa_counterexample, dfa_inclusion_counterexample
+from FiniteAutomata.fa.export import export_graph, merged_edges, neighborhood, ranges_label
+from FiniteAutomata.fa.instrumentation import emit, hooks
+from FiniteAutomata.fa.matcher import DFAMatcher, match_file
 from FiniteAutomata.fa.nfa import NFA
+from FiniteAutomata.fa.parallel import MatcherPool, check_string_parallel
+from FiniteAutomata.fa.regex import Regex
+from FiniteAutomata.fa.search import Searcher, reversed_bit_nfa
+from FiniteAutomata.fa.stream import match_stream
 from graphviz import Digraph
 
 DFA = TypeVar('DFA')
 
 
 class DFA:
-    def __init__(self, *, regex: str = None, nfa: NFA = None) -> None:
+    """
+    Immutable DFA, operations return new DFAs and share the unchanged parts with this one, so copy is free.
+    The transitions table, states, symbols and final states are read-only.
+    """
+
+    # The budgets of converting and minimizing, None for no limit.
+    # They apply to every DFA that is not given its own, so setting them here guards the whole process.
+    max_states = None
+    max_memory = None
+    max_seconds = None
+
+    def __init__(self, *, regex: str = None, nfa: NFA = None, construction: str = 'thompson',
+                 max_states: int = None, max_memory: int = None, max_seconds: float = None) -> None:
         """
+        Exceeding a budget raises StateExplosionException, see build_matcher for a fallback to NFA simulation.
         regex: the regex that would be converted into dfa
         regex type: str
         nfa: the nfa that would be converted into dfa
         nfa type: NFA
+        construction: how the nfa of the regex is built, 'thompson' or 'glushkov' (epsilon-free position automaton), see NFA
+        construction type: str
+        max_states: the most DFA states the conversion may build, None for the class value DFA.max_states
+        max_states type: int
+        max_memory: the most bytes the DFA states and transitions may take while converting, estimated, None for the class value DFA.max_memory
+        max_memory type: int
+        max_seconds: the most seconds converting, and then every minimization, may take, None for the class value DFA.max_seconds
+        max_seconds type: float
         """
+        if max_states is not None:
+            self.max_states = max_states
+        if max_memory is not None:
+            self.max_memory = max_memory
+        if max_seconds is not None:
+            self.max_seconds = max_seconds
         if nfa:
-            self.nfa = nfa.copy()
+            self._nfa = nfa
         elif regex:
-            self.regex = regex
+            self._nfa = NFA(regex, construction=construction)
         else:
             raise DFAInvalidArgumentsException(
                 "Input should be regex or NFA.")
+        self._convert_NFA_To_DFA()
+        self._shrink_states_names()
+
+    def _set_table(self, transitions_table: Dict[str, Dict[str, str]], start_state: str, final_states: Iterable[str], symbols: Iterable[str]) -> None:
+        """Set the automaton, the transitions table is owned by the DFA from now on, and shared only with DFAs that do not change it."""
+        self._transitions_table = transitions_table
+        self._states = tuple(sorted(transitions_table.keys()))
+        self._symbols = frozenset(symbols)
+        self._start_state = start_state
+        self._final_states = frozenset(final_states)
+        self._view = None
+        self._compiled = None
 
     @property
-    def nfa(self) -> NFA:
+    def nfa(self) -> Optional[NFA]:
         return self._nfa
 
-    @nfa.setter
-    def nfa(self, nfa: NFA) -> None:
-        self._nfa = nfa
-        self._convert_NFA_To_DFA()
-        self._shrink_states_names()
+    @property
+    def regex(self) -> Optional[Regex]:
+        """The regex of the DFA, None for a DFA built by a product operation or complement."""
+        return self.nfa.regex if self.nfa is not None else None
+
+    def __getstate__(self) -> dict:
+        """Pickle the DFA without its read-only view and compiled matcher, they are built again when used."""
+        state = dict(self.__dict__)
+        state['_view'] = None
+        state['_compiled'] = None
+        return state
+
+    @property
+    def transitions_table(self) -> Mapping[str, Mapping[str, str]]:
+        """
+        Read-only view of the transitions, every state maps every symbol to the next state.
+        It keeps an entry per symbol, symbols of one class included, compile() stores one column per group of symbols with the same transitions.
+        """
+        if self._view is None:
+            self._view = MappingProxyType({state: MappingProxyType(transitions)
+                                           for state, transitions in self._transitions_table.items()})
+        return self._view
+
+    @property
+    def states(self) -> Tuple[str, ...]:
+        return self._states
 
     @property
-    def regex(self) -> Expression:
-        return self.nfa.regex
+    def symbols(self) -> FrozenSet[str]:
+        return self._symbols
 
-    @regex.setter
-    def regex(self, regex: str) -> None:
-        self.nfa = NFA(regex)
+    @property
+    def start_state(self) -> str:
+        return self._start_state
+
+    @property
+    def final_states(self) -> FrozenSet[str]:
+        return self._final_states
 
     def __str__(self) -> str:
-        return f"< Symbols: {self.symbols}\n  States: {self.states}\n  Transitions Table: {self.transitions_table}\n  Start State: {self.start_state}\n  Final States: {self.final_states} >"
+        return f"< Symbols: {set(self.symbols)}\n  States: {list(self.states)}\n  Transitions Table: {self._transitions_table}\n  Start State: {self.start_state}\n  Final States: {set(self.final_states)} >"
 
     def __repr__(self) -> str:
+        if self.nfa is None:
+            return f"DFA(states={len(self.states)}, symbols={len(self.symbols)})"
         return f"DFA('regex = {self.regex.expression}')"
 
     def __iter__(self):
@@ -53,150 +133,168 @@ class DFA:
             yield (state, transitions)
 
     def copy(self) -> DFA:
-        """Create a deep copy of the DFA."""
-        new_dfa = self.__class__(nfa=self.nfa)
-        new_dfa.transitions_table = copy.deepcopy(self.transitions_table)
-        new_dfa.states = copy.copy(self.states)
-        new_dfa.final_states = copy.copy(self.final_states)
-        new_dfa.symbols = copy.copy(self.symbols)
-        new_dfa.start_state = self.start_state
-        return new_dfa
+        """Return the DFA itself, it is immutable."""
+        return self
 
     def _convert_NFA_To_DFA(self) -> None:
         """Convert NFA transitions to DFA transitions"""
 
+        symbols = sorted(set(self.nfa.symbols).difference({'$'}))
+        DFA_States, DFA_States_Transitions, columns = subset_construction(
+            self.nfa._transitions_table, self.nfa.start_state, symbols, self.nfa.regex.symbol_classes(),
+            max_states=self.max_states, max_memory=self.max_memory, max_seconds=self.max_seconds)
+        DFA_States_Names = [','.join(sorted(DfaState))
+                            for DfaState in DFA_States]
+        # The index -1 of the empty set names the dead state.
+        DFA_States_Names.append("Dead State")
+
+        # The rows of the construction hold one entry per symbol class. transitions_table keeps one entry per symbol,
+        # as it maps symbols to states, while minimize, compile and save read one column per group of symbols with the same transitions.
         DFA_Transitions = {}
-        DFA_States = []
-        has_deadState = False
-        symbols = self.regex.get_operands()
-        symbols.discard('$')
-
-        states_epsilon_closure = {}
-        for state in self.nfa.transitions_table.keys():
-            states_epsilon_closure[state] = self.nfa.state_epsilon_closure(
-                state)
-
-        DFA_States.append(sorted(states_epsilon_closure[self.nfa.start_state]))
-        self.start_state = ','.join(
-            sorted(states_epsilon_closure[self.nfa.start_state]))
-        self.final_states = set()
-
-        for DfaStateFrom in DFA_States:
-            DfaStateFrom_Str = ','.join(sorted(DfaStateFrom))
-            DFA_Transitions[DfaStateFrom_Str] = {}
-
-            if self.nfa.final_state in DfaStateFrom:
-                self.final_states.add(DfaStateFrom_Str)
-
-            for symbol in sorted(symbols):
-                DfaStateTo = set()
-                for stateFrom in DfaStateFrom:
-                    for stateTo in self.nfa.transitions_table[stateFrom].setdefault(symbol, set()):
-                        DfaStateTo.add(stateTo)
-                        DfaStateTo.update(states_epsilon_closure[stateTo])
-
-                DfaStateTo_Str = ','.join(sorted(DfaStateTo))
-                DFA_Transitions[DfaStateFrom_Str][symbol] = DfaStateTo_Str
-
-                if DfaStateTo_Str == '':
-                    has_deadState = True
-                    DFA_Transitions[DfaStateFrom_Str][symbol] = "Dead State"
-
-                if sorted(DfaStateTo) not in DFA_States and DfaStateTo:
-                    DFA_States.append(sorted(DfaStateTo))
-
-        if has_deadState:
-            DFA_Transitions["Dead State"] = {}
-            for symbol in sorted(symbols):
-                DFA_Transitions["Dead State"][symbol] = "Dead State"
-
-        self.transitions_table = copy.deepcopy(DFA_Transitions)
-        self.states = sorted(DFA_Transitions.keys())
-        self.symbols = self.regex.get_operands()
+        for DfaStateFrom_Str, transitions in zip(DFA_States_Names, DFA_States_Transitions):
+            names = [DFA_States_Names[number] for number in transitions]
+            DFA_Transitions[DfaStateFrom_Str] = {
+                symbol: names[column] for symbol, column in columns.items()}
+        if any(-1 in transitions for transitions in DFA_States_Transitions):
+            DFA_Transitions["Dead State"] = {
+                symbol: "Dead State" for symbol in symbols}
 
-    def minimize(self) -> DFA:
-        """Minimize the DFA states using Hopcroft's algorithm"""
-        equivalence_classes = []
-        equivalence_classes.append(copy.copy(self.final_states))
-        equivalence_classes.append(
-            set(self.states).difference(self.final_states))
-
-        while True:
-            counter = 0
-            state_class = {}
-            for Class in equivalence_classes:
-                for state in Class:
-                    state_class[state] = counter
-                counter += 1
-
-            prev_equivalence_classes = copy.deepcopy(equivalence_classes)
-            next_equivalence_classes = []
-            for Class in equivalence_classes:
-                while Class:
-                    curr_state = Class.pop()
-                    next_class = {curr_state}
-                    for state in sorted(Class):
-                        flag = True
-                        for symbol in self.symbols:
-                            if state_class[self.transitions_table[state][symbol]] != state_class[self.transitions_table[curr_state][symbol]]:
-                                flag = False
-                                break
-                        if flag:
-                            next_class.add(state)
-                            Class.remove(state)
-                    next_equivalence_classes.append(next_class)
-            equivalence_classes = next_equivalence_classes
-
-            if prev_equivalence_classes == next_equivalence_classes:
-                break
+        self._set_table(DFA_Transitions, DFA_States_Names[0], {name for DfaState, name in zip(
+            DFA_States, DFA_States_Names) if not self.nfa.final_states.isdisjoint(DfaState)}, symbols)
 
+    def minimize(self) -> DFA:
+        """Minimize the DFA states using Hopcroft's algorithm, raise StateExplosionException if it takes more than max_seconds"""
+        instrumented = bool(hooks)
+        if instrumented:
+            start = perf_counter()
+            rounds = 0
+        deadline = perf_counter() + self.max_seconds if self.max_seconds is not None else None
+        # Symbols with the same transitions from every state split the same classes, one of them is enough.
+        symbols = list(symbol_columns(self._transitions_table, self.symbols))
+        inverse_transitions = {symbol: {} for symbol in symbols}
+        for state_from, transitions in self._transitions_table.items():
+            for symbol in symbols:
+                inverse_transitions[symbol].setdefault(
+                    transitions[symbol], []).append(state_from)
+
+        equivalence_classes = [Class for Class in (set(self.final_states), set(
+            self.states).difference(self.final_states)) if Class]
+        state_class = {}
+        for counter, Class in enumerate(equivalence_classes):
+            for state in Class:
+                state_class[state] = counter
+
+        # Only the smaller half of a split class has to be added as a splitter,
+        # unless the class was still waiting, then both halves are.
+        waiting = set(range(len(equivalence_classes)))
+        while waiting:
+            splitter = list(equivalence_classes[waiting.pop()])
+            if instrumented:
+                rounds += 1
+            if deadline is not None and perf_counter() > deadline:
+                raise StateExplosionException(
+                    f"minimizing {len(self.states)} states took more than {self.max_seconds} seconds")
+            for symbol in symbols:
+                predecessors = inverse_transitions[symbol]
+                touched = {}
+                for state_to in splitter:
+                    for state_from in predecessors.get(state_to, ()):
+                        touched.setdefault(
+                            state_class[state_from], set()).add(state_from)
+
+                for counter, states in touched.items():
+                    Class = equivalence_classes[counter]
+                    if len(states) == len(Class):
+                        continue
+                    Class.difference_update(states)
+                    new_counter = len(equivalence_classes)
+                    equivalence_classes.append(states)
+                    for state in states:
+                        state_class[state] = new_counter
+                    if counter in waiting or len(states) <= len(Class):
+                        waiting.add(new_counter)
+                    else:
+                        waiting.add(counter)
+
+        classes_names = [','.join(sorted(Class))
+                         for Class in equivalence_classes]
         new_transitions_table = {}
-        for class_from in equivalence_classes:
-            new_transitions_table[','.join(sorted(class_from))] = {}
-            for symbol in self.symbols:
-                state_to = self.transitions_table[list(class_from)[0]][symbol]
-                for class_to in equivalence_classes:
-                    if state_to in class_to:
-                        new_transitions_table[','.join(
-                            sorted(class_from))][symbol] = ','.join(sorted(class_to))
-                        break
-
-        new_dfa = self.copy()
-        new_dfa.transitions_table = copy.deepcopy(new_transitions_table)
-        new_dfa.states = sorted(new_transitions_table.keys())
-
-        for Class in equivalence_classes:
-            if new_dfa.start_state in Class:
-                new_dfa.start_state = ','.join(sorted(Class))
-                break
-        final_states_temp = set()
-        for Class in equivalence_classes:
-            for state in new_dfa.final_states:
-                if state in Class:
-                    final_states_temp.add(','.join(sorted(Class)))
-        new_dfa.final_states = copy.copy(final_states_temp)
+        for name, Class in zip(classes_names, equivalence_classes):
+            transitions = self._transitions_table[next(iter(Class))]
+            new_transitions_table[name] = {
+                symbol: classes_names[state_class[state_to]] for symbol, state_to in transitions.items()}
+
+        new_dfa = self._derive(new_transitions_table, classes_names[state_class[self.start_state]], {
+                               classes_names[state_class[state]] for state in self.final_states})
         new_dfa._shrink_states_names()
+        if instrumented:
+            emit('minimize', seconds=perf_counter() - start, rounds=rounds,
+                 states=len(self.states), minimal_states=len(new_dfa.states))
 
         return new_dfa
 
+    def _derive(self, transitions_table: dict, start_state: str, final_states: set) -> DFA:
+        """Return a DFA of the same NFA with another transitions table, without converting the NFA again."""
+        new_dfa = self._from_table(
+            transitions_table, start_state, final_states, self.symbols)
+        new_dfa._nfa = self._nfa
+        # The budgets given to this DFA carry over, the others stay the class values.
+        for budget in ('max_states', 'max_memory', 'max_seconds'):
+            if budget in vars(self):
+                setattr(new_dfa, budget, vars(self)[budget])
+        return new_dfa
+
+    @classmethod
+    def _from_table(cls, transitions_table: dict, start_state: str, final_states: set, symbols: Iterable[str]) -> DFA:
+        """Return a DFA of a complete transitions table, without an NFA."""
+        new_dfa = cls.__new__(cls)
+        new_dfa._nfa = None
+        new_dfa._set_table(transitions_table, start_state,
+                           final_states, symbols)
+        return new_dfa
+
+    def _product(self, other: DFA, accept, minimize: bool) -> DFA:
+        """
+        Return the product DFA of the reachable pairs of states, a pair is final if accept(final in self, final in other).
+        A symbol only one of the DFAs has leads the other one to a dead state, written None.
+        """
+        if not isinstance(other, DFA):
+            raise TypeError(
+                f"other has to be a DFA. {other} is {type(other)}, not DFA.")
+        symbols = sorted(self.symbols | other.symbols)
+        start = (self.start_state, other.start_state)
+        pairs = [start]
+        pairs_names = {start: '0'}
+        transitions_table = {}
+        final_states = set()
+        for pair in pairs:
+            state, other_state = pair
+            name = pairs_names[pair]
+            transitions = self._transitions_table[state] if state is not None else {}
+            other_transitions = other._transitions_table[other_state] if other_state is not None else {}
+            if accept(state in self.final_states, other_state in other.final_states):
+                final_states.add(name)
+            row = transitions_table[name] = {}
+            for symbol in symbols:
+                next_pair = (transitions.get(symbol), other_transitions.get(symbol))
+                next_name = pairs_names.get(next_pair)
+                if next_name is None:
+                    next_name = pairs_names[next_pair] = str(len(pairs))
+                    pairs.append(next_pair)
+                row[symbol] = next_name
+
+        new_dfa = self._from_table(transitions_table, '0', final_states, symbols)
+        return new_dfa.minimize() if minimize else new_dfa
+
     def _shrink_states_names(self) -> None:
         "Shrink DFA states names that formed from converting NFA to DFA or merging states"
         mapping = {}
         for num, state in enumerate(self.states):
             mapping[state] = str(num)
 
-        for stateFrom in copy.deepcopy(self.transitions_table):
-            for symbol in copy.deepcopy(self.transitions_table[stateFrom]):
-                self.transitions_table[stateFrom][symbol] = mapping[self.transitions_table[stateFrom][symbol]]
-            self.transitions_table[mapping[stateFrom]
-                                   ] = self.transitions_table.pop(stateFrom)
-
-        self.states = sorted(self.transitions_table.keys())
-        self.start_state = mapping[self.start_state]
-
-        for state in self.final_states.copy():
-            self.final_states.remove(state)
-            self.final_states.add(mapping[state])
+        self._set_table({mapping[stateFrom]: {symbol: mapping[stateTo] for symbol, stateTo in transitions.items()}
+                         for stateFrom, transitions in self._transitions_table.items()},
+                        mapping[self.start_state], {mapping[state] for state in self.final_states}, self.symbols)
 
     def check_string(self, input: str) -> Tuple[bool, str]:
         """
@@ -207,23 +305,206 @@ class DFA:
         if not isinstance(input, str):
             raise TypeError(
                 f"input has to be a str. {input} is {type(input)}, not str.")
+        transitions_table = self._transitions_table
         current_state = self.start_state
         for c in input:
-            current_state = self.transitions_table[current_state][c]
-
+            current_state = transitions_table[current_state][c]
+
+        if hooks:
+            accepted = current_state in self.final_states
+            dead = not accepted and all(
+                state == current_state for state in transitions_table[current_state].values())
+            emit('match', engine='dfa', steps=len(input),
+                 accepted=accepted, dead=dead)
         return current_state in self.final_states, current_state
 
+    def compile(self) -> CompiledDFA:
+        """Return an immutable matcher over integer states that accepts the same strings as the DFA, built once."""
+        if self._compiled is None:
+            self._compiled = CompiledDFA.from_dfa(self)
+        return self._compiled
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Write the compiled DFA to a binary file, DFA.load reads it back.
+        path: the path of the file
+        path type: str or os.PathLike
+        """
+        self.compile().save(path)
+
+    @staticmethod
+    def load(path: Union[str, os.PathLike]) -> CompiledDFA:
+        """
+        Return the compiled DFA saved in a binary file, the file is memory-mapped and its transition table is used in place.
+        path: the path of the file
+        path type: str or os.PathLike
+        """
+        return CompiledDFA.load(path)
+
+    def check_many(self, strings: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return a boolean array that is True where the string is accepted by the regex, and the array of the last states the strings reach.
+        The last states are indexes into dfa.states.
+        strings: the strings that will be checked
+        strings type: iterable of str
+        """
+        return self.compile().check_many(strings)
+
+    def check_string_parallel(self, input: str, *, processes: int = None, executor: Executor = None) -> Tuple[bool, str]:
+        """
+        Return True if the input is accepted by the regex, and last state the input reaches, like check_string.
+        The input is split into chunks read in a process pool, for very large inputs.
+        input: the string that will be checked
+        input type: str
+        processes: the number of chunks and worker processes, the number of CPUs if None
+        processes type: int
+        executor: the process pool the chunks are run in, a new one is used if None
+        executor type: concurrent.futures.Executor
+        """
+        return check_string_parallel(self.compile(), input, processes=processes, executor=executor)
+
+    def pool(self, *, processes: int = None, batch_size: int = 1024, max_pending: int = None) -> MatcherPool:
+        """
+        Return a process pool that matches batches of strings, its workers share one copy of the compiled DFA, see MatcherPool.
+        processes: the number of worker processes, the number of CPUs if None
+        processes type: int
+        batch_size: the number of strings sent to a worker at once
+        batch_size type: int
+        max_pending: the most batches submitted and not yet consumed, 2 per process if None
+        max_pending type: int
+        """
+        return MatcherPool(self.compile(), processes=processes, batch_size=batch_size, max_pending=max_pending)
+
+    def matcher(self, *, encoding: str = 'utf-8') -> DFAMatcher:
+        """
+        Return an incremental matcher, the input is fed to it in chunks.
+        encoding: the encoding bytes chunks are decoded with
+        encoding type: str
+        """
+        return DFAMatcher(self.compile(), encoding=encoding)
+
+    def check_file(self, path: Union[str, os.PathLike], *, window: int = 1 << 20, encoding: str = 'utf-8') -> Tuple[bool, str]:
+        """
+        Return True if the file content is accepted by the regex, and last state it reaches.
+        The file is memory-mapped and read in windows, so memory does not grow with the file size.
+        path: the path of the file
+        path type: str or os.PathLike
+        window: the number of bytes read at once
+        window type: int
+        encoding: the encoding of the file
+        encoding type: str
+        """
+        return match_file(self.matcher(encoding=encoding), path, window=window)
+
+    async def check_stream(self, stream: Union[asyncio.StreamReader, AsyncIterable[Union[str, bytes]]], *, encoding: str = 'utf-8',
+                           read_size: int = 1 << 16, offload_size: int = 1 << 18, executor: Executor = None,
+                           stop_when_dead: bool = True, stop_when_accepted: bool = False) -> Tuple[bool, str]:
+        """
+        Return True if the stream content is accepted by the regex, and last state it reaches, see match_stream.
+        The chunks are matched as they arrive, without blocking the event loop, and reading stops early once the stream is decided.
+        stream: an asyncio.StreamReader or an async iterable of str or bytes chunks
+        stream type: asyncio.StreamReader or async iterable
+        encoding: the encoding bytes chunks are decoded with
+        encoding type: str
+        read_size: the most bytes read from a stream reader at once
+        read_size type: int
+        offload_size: the length from which a chunk is matched in the executor
+        offload_size type: int
+        executor: the executor long chunks are matched in, the default executor of the event loop if None
+        executor type: concurrent.futures.Executor
+        stop_when_dead: stop reading once no input can be accepted anymore
+        stop_when_dead type: bool
+        stop_when_accepted: stop reading at the first accepted prefix
+        stop_when_accepted type: bool
+        """
+        return await match_stream(self.matcher(encoding=encoding), stream, read_size=read_size, offload_size=offload_size,
+                                  executor=executor, stop_when_dead=stop_when_dead, stop_when_accepted=stop_when_accepted)
+
+    def searcher(self) -> Searcher:
+        """Return a searcher of the regex matches inside texts, reuse it to search many texts."""
+        return Searcher(self.compile(), reversed_bit_nfa(self.transitions_table, self.start_state, self.final_states))
+
+    def search(self, text: str, pos: int = 0) -> Optional[Tuple[int, int]]:
+        """
+        Return the start and end of the leftmost-longest match of the regex in text[pos:], None if there is none.
+        text: the text that will be searched
+        text type: str
+        pos: the index the search starts at
+        pos type: int
+        """
+        return self.searcher().search(text, pos)
+
+    def finditer(self, text: str, pos: int = 0) -> Iterator[Tuple[int, int]]:
+        """
+        Return an iterator over the start and end of the non-overlapping leftmost-longest matches of the regex in text[pos:].
+        text: the text that will be searched
+        text type: str
+        pos: the index the search starts at
+        pos type: int
+        """
+        return self.searcher().finditer(text, pos)
+
+    def count(self, text: str, pos: int = 0) -> int:
+        """
+        Return the number of the non-overlapping leftmost-longest matches of the regex in text[pos:].
+        text: the text that will be searched
+        text type: str
+        pos: the index the search starts at
+        pos type: int
+        """
+        return self.searcher().count(text, pos)
+
     def closure(self) -> DFA:
         """Return DFA that accepts the regex repeated zero or more times"""
+        self._check_has_nfa('closure')
         return DFA(nfa=self.nfa.closure())
 
-    def union(self, regex: str) -> DFA:
+    def union(self, regex: Union[str, DFA], *, minimize: bool = False) -> DFA:
         """
         Return DFA that accepts union of this regex with another regex.
-        regex: the regex that will be unioned with the object regex
-        regex type: str
+        A DFA is combined with the product of the two transitions tables, nothing is converted again.
+        regex: the regex or the DFA that will be unioned with the object regex
+        regex type: str or DFA
+        minimize: if True the result is minimized
+        minimize type: bool
+        """
+        if isinstance(regex, DFA):
+            return self._product(regex, lambda final, other_final: final or other_final, minimize)
+        if self.nfa is None:
+            return self.union(DFA(regex=regex), minimize=minimize)
+        new_dfa = DFA(nfa=self.nfa.union(regex))
+        return new_dfa.minimize() if minimize else new_dfa
+
+    def intersection(self, other: DFA, *, minimize: bool = False) -> DFA:
         """
-        return DFA(nfa=self.nfa.union(regex))
+        Return DFA that accepts the strings both DFAs accept, built from the reachable pairs of their states.
+        other: the DFA that will be intersected with this DFA
+        other type: DFA
+        minimize: if True the result is minimized
+        minimize type: bool
+        """
+        return self._product(other, lambda final, other_final: final and other_final, minimize)
+
+    def difference(self, other: DFA, *, minimize: bool = False) -> DFA:
+        """
+        Return DFA that accepts the strings this DFA accepts and the other DFA does not, built from the reachable pairs of their states.
+        other: the DFA whose strings are removed
+        other type: DFA
+        minimize: if True the result is minimized
+        minimize type: bool
+        """
+        return self._product(other, lambda final, other_final: final and not other_final, minimize)
+
+    def complement(self, *, minimize: bool = False) -> DFA:
+        """
+        Return DFA over the same symbols that accepts the strings this DFA does not accept.
+        minimize: if True the result is minimized
+        minimize type: bool
+        """
+        # Only the final states change, the transitions table is shared.
+        new_dfa = self._from_table(self._transitions_table, self.start_state,
+                                   set(self.states).difference(self.final_states), self.symbols)
+        return new_dfa.minimize() if minimize else new_dfa
 
     def concatenate(self, regex: str) -> DFA:
         """
@@ -231,8 +512,87 @@ class DFA:
         regex: the regex that will be concatenated with the object regex
         regex type: str
         """
+        self._check_has_nfa('concatenate')
         return DFA(nfa=self.nfa.concatenate(regex))
 
+    def equivalent(self, other: DFA) -> Tuple[bool, Optional[str]]:
+        """
+        Return True if both DFAs accept the same strings, else False and a shortest string only one of them accepts.
+        Hopcroft and Karp's union-find over the two transitions tables, near-linear in their size, nothing is minimized.
+        other: the DFA compared with this DFA
+        other type: DFA
+        """
+        if not isinstance(other, DFA):
+            raise TypeError(
+                f"other has to be a DFA. {other} is {type(other)}, not DFA.")
+        counterexample = dfa_counterexample(self._transitions_table, self.start_state, self.final_states,
+                                            other._transitions_table, other.start_state, other.final_states)
+        return counterexample is None, counterexample
+
+    def includes(self, other: DFA) -> Tuple[bool, Optional[str]]:
+        """
+        Return True if this DFA accepts every string the other DFA accepts, else False and a shortest string only the other accepts.
+        The reachable pairs of states are followed breadth first, each once.
+        other: the DFA whose strings should be accepted
+        other type: DFA
+        """
+        if not isinstance(other, DFA):
+            raise TypeError(
+                f"other has to be a DFA. {other} is {type(other)}, not DFA.")
+        counterexample = dfa_inclusion_counterexample(self._transitions_table, self.start_state, self.final_states,
+                                                      other._transitions_table, other.start_state, other.final_states)
+        return counterexample is None, counterexample
+
+    def _check_has_nfa(self, operation: str) -> None:
+        if self.nfa is None:
+            raise DFAInvalidArgumentsException(
+                f"{operation} needs the regex of the DFA, and a DFA built by a product operation or complement has none.")
+
+    def neighborhood(self, state: str, hops: int = 1) -> Tuple[str, ...]:
+        """
+        Return the states reached from state by following at most hops transitions, in breadth first order.
+        Only the states found are read, so a small view of a large DFA is found quickly.
+        state: the state the neighborhood is around
+        state type: str
+        hops: the most transitions followed
+        hops type: int
+        """
+        if not isinstance(state, str):
+            raise TypeError(
+                f"state has to be a str. {state} is {type(state)}, not str.")
+        return neighborhood(self._transitions_table, (state,), hops)
+
+    def trace(self, input: str) -> Tuple[str, ...]:
+        """
+        Return the states check_string goes through for the input, in order of first visit.
+        input: the string that is checked
+        input type: str
+        """
+        if not isinstance(input, str):
+            raise TypeError(
+                f"input has to be a str. {input} is {type(input)}, not str.")
+        transitions_table = self._transitions_table
+        current_state = self.start_state
+        states = {current_state: None}
+        for c in input:
+            current_state = transitions_table[current_state][c]
+            states[current_state] = None
+        return tuple(states)
+
+    def export(self, file: Union[str, os.PathLike, TextIO], *, format: str = 'dot', states: Iterable[str] = None) -> None:
+        """
+        Write the DFA graph as DOT or JSON, line by line, without building a Digraph in memory.
+        Parallel transitions are merged into one edge labeled with symbol ranges, like 'a-z'.
+        file: the path of the file, or a text file the graph is written to
+        file type: str, os.PathLike or text file
+        format: 'dot' or 'json'
+        format type: str
+        states: the states of the view written, like neighborhood or trace, all states if None
+        states type: iterable of str
+        """
+        export_graph(file, self._transitions_table, self.start_state, self.final_states,
+                     self.states if states is None else states, format=format, name='DFA Graph')
+
     def visualize(self, *, filename: str = 'dfa-graph',
                   format: str = 'png',
                   path: str = None,
@@ -243,7 +603,9 @@ class DFA:
                   subgroup_color: str = "#A8A8A8",
                   bgcolor: str = "#FFFFFF",
                   arrow_color: str = "#000000",
-                  fontcolor: str = "#000000") -> Digraph:
+                  fontcolor: str = "#000000",
+                  states: Iterable[str] = None,
+                  render: bool = True) -> Digraph:
         """
         Return NFA graph.
         filename: name of file of nfa graph
@@ -266,6 +628,10 @@ class DFA:
         arrow_color type: str of hex or color name
         fontcolor: color of font in the graph
         fontcolor type: str of hex or color name
+        states: the states of the view drawn, like neighborhood or trace, all states if None
+        states type: iterable of str
+        render: if False the graph is only returned, not rendered to a file
+        render type: bool
         """
 
         graph = Digraph('DFA Graph')
@@ -275,7 +641,10 @@ class DFA:
 
         graph.node('Initial', shape='point',
                    color=state_color, fontcolor=fontcolor)
-        for state in self.states:
+        states = self.states if states is None else tuple(dict.fromkeys(states))
+        for state in states:
+            if state not in self._transitions_table:
+                raise InvalidStateException(f"the state {state} is not valid")
             if state in self.final_states and state in subgroup_states:
                 graph.node(state, shape='doublecircle',
                            color=state_color, fillcolor=subgroup_color, style='filled', fontcolor=fontcolor)
@@ -289,15 +658,113 @@ class DFA:
                 graph.node(state, shape='circle',
                            color=state_color, fontcolor=fontcolor)
 
-        for stateFrom in self.transitions_table.keys():
-            for symbol in self.transitions_table[stateFrom].keys():
-                graph.edge(stateFrom, self.transitions_table[stateFrom][symbol],
-                           label=symbol, color=arrow_color, fontcolor=fontcolor)
-        graph.edge('Initial', self.start_state, color=arrow_color)
+        for stateFrom, stateTo, ranges in merged_edges(self._transitions_table, states):
+            graph.edge(stateFrom, stateTo, label=ranges_label(ranges),
+                       color=arrow_color, fontcolor=fontcolor)
+        if self.start_state in states:
+            graph.edge('Initial', self.start_state, color=arrow_color)
 
+        if not render:
+            return graph
         if view:
             graph.render(filename=filename, format=format,
                          directory=path, view=True)
         else:
             graph.render(filename=filename, format=format, directory=path)
         return graph
+
+
+def subset_construction(transitions_table: dict, start_state: str, symbols: Iterable[str], symbol_classes: Dict[str, int] = None, *,
+                        max_states: int = None, max_memory: int = None, max_seconds: float = None) -> Tuple[List[FrozenSet[str]], List[Tuple[int, ...]], Dict[str, int]]:
+    """
+    Return the DFA states reachable from the start state, each a frozenset of NFA states, in the order they are discovered,
+    the transitions of each DFA state, a row with the index of the next DFA state on every symbol class, or -1 for the empty set (dead state),
+    and the column of every symbol in the rows, so a row stores one entry per class, not per symbol.
+    transitions_table: NFA transitions, '$' is the epsilon symbol
+    transitions_table type: dict
+    start_state: the NFA start state
+    start_state type: str
+    symbols: the symbols of the DFA, the transitions follow their order
+    symbols type: iterable of str
+    symbol_classes: the class of every symbol, the moves are computed once per class, reading a symbol as reading any symbol of its class.
+                    Only classes whose symbols can replace each other in the accepted strings keep the language, see Regex.symbol_classes.
+                    Every symbol is its own class if None
+    symbol_classes type: dict
+    max_states, max_memory, max_seconds: the budget of the construction, states discovered, bytes of the DFA states and their transitions (estimated) and seconds,
+                                         exceeding one raises StateExplosionException. None for no limit
+    max_states, max_memory type: int
+    max_seconds type: float
+    """
+    instrumented = bool(hooks)
+    if instrumented:
+        start_time = perf_counter()
+    deadline = perf_counter() + max_seconds if max_seconds is not None else None
+    symbols = list(symbols)
+    if symbol_classes is None:
+        symbol_classes = {symbol: Class for Class, symbol in enumerate(symbols)}
+    classes = sorted({symbol_classes[symbol] for symbol in symbols})
+    class_columns = {Class: column for column, Class in enumerate(classes)}
+
+    # Subsets are indexed to their position in DFA_States,
+    # and the epsilon closure of every distinct move is computed once.
+    moves_epsilon_closure = {}
+
+    def epsilon_closure(states: Iterable[str]) -> FrozenSet[str]:
+        # One search from all the states, so a state shared by their closures is visited once,
+        # and no closure is kept per NFA state, they can be as large as the NFA each.
+        DfaState = set(states)
+        stack = list(DfaState)
+        while stack:
+            for stateTo in transitions_table[stack.pop()].get('$', ()):
+                if stateTo not in DfaState:
+                    DfaState.add(stateTo)
+                    stack.append(stateTo)
+        return frozenset(DfaState)
+
+    start = epsilon_closure((start_state,))
+    DFA_States = [start]
+    DFA_States_Index = {start: 0}
+    DFA_States_Transitions = []
+    # Estimated bytes of a transitions row, the subsets are added as they are discovered.
+    row_size = sys.getsizeof(tuple(classes))
+    memory = sys.getsizeof(start)
+
+    for DfaStateFrom in DFA_States:
+        if deadline is not None and perf_counter() > deadline:
+            raise StateExplosionException(
+                f"converting took more than {max_seconds} seconds, after {len(DFA_States)} DFA states")
+        memory += row_size
+        moves = {}
+        for stateFrom in DfaStateFrom:
+            for symbol, statesTo in transitions_table[stateFrom].items():
+                if symbol != '$':
+                    moves.setdefault(symbol_classes[symbol], set()).update(statesTo)
+
+        transitions = []
+        for Class in classes:
+            move = frozenset(moves.get(Class, ()))
+            DfaStateTo = moves_epsilon_closure.get(move)
+            if DfaStateTo is None:
+                DfaStateTo = moves_epsilon_closure[move] = epsilon_closure(move)
+
+            if not DfaStateTo:
+                transitions.append(-1)
+                continue
+            number = DFA_States_Index.get(DfaStateTo)
+            if number is None:
+                number = DFA_States_Index[DfaStateTo] = len(DFA_States)
+                DFA_States.append(DfaStateTo)
+                memory += sys.getsizeof(DfaStateTo)
+                if max_states is not None and len(DFA_States) > max_states:
+                    raise StateExplosionException(
+                        f"the DFA has more than {max_states} states")
+                if max_memory is not None and memory > max_memory:
+                    raise StateExplosionException(
+                        f"the DFA states take more than {max_memory} bytes, after {len(DFA_States)} states")
+            transitions.append(number)
+        DFA_States_Transitions.append(tuple(transitions))
+
+    if instrumented:
+        emit('subset_construction', seconds=perf_counter() - start_time,
+             dfa_states=len(DFA_States), epsilon_closures=len(moves_epsilon_closure))
+    return DFA_States, DFA_States_Transitions, {symbol: class_columns[symbol_classes[symbol]] for symbol in symbols}
@@ -0,0 +1,186 @@
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+from FiniteAutomata.fa.bit_nfa import BitNFA
+
+
+def _word(entries: List[Tuple[int, str]], entry: int) -> str:
+    """Return the symbols read from the first entry to this one, entries are (parent entry, symbol)."""
+    symbols = []
+    while entry > 0:
+        entry, symbol = entries[entry]
+        symbols.append(symbol)
+    return ''.join(reversed(symbols))
+
+
+def _successors(tables: Sequence[Tuple[Dict[str, Dict[str, str]], Iterable[str]]], symbols: Sequence[str]) -> Tuple[List[List[int]], List[bool], List[Dict[str, int]]]:
+    """
+    Number the states of the DFAs one after the other, each followed by its own dead state,
+    and return the successors of every number for every symbol, the final flags and the numbers of the states of each DFA.
+    A symbol a DFA does not have leads it to its dead state.
+    """
+    successors, finals, numbers = [], [], []
+    for transitions_table, final_states in tables:
+        index = {state: len(successors) + number for number,
+                 state in enumerate(transitions_table)}
+        dead = len(successors) + len(index)
+        final_states = set(final_states)
+        for state, transitions in transitions_table.items():
+            successors.append([index[transitions[symbol]] if symbol in transitions else dead
+                               for symbol in symbols])
+            finals.append(state in final_states)
+        successors.append([dead] * len(symbols))
+        finals.append(False)
+        numbers.append(index)
+    return successors, finals, numbers
+
+
+def dfa_counterexample(transitions_table: Dict[str, Dict[str, str]], start_state: str, final_states: Iterable[str],
+                       other_transitions_table: Dict[str, Dict[str, str]], other_start_state: str, other_final_states: Iterable[str]) -> Optional[str]:
+    """
+    Return a shortest string accepted by exactly one of the two DFAs, None if they accept the same strings.
+    Hopcroft and Karp's algorithm: pairs of states that must be equivalent are merged in a union-find,
+    and a pair is followed only if its states are not merged yet, so at most one pair per state is followed,
+    near-linear in the states times the symbols. Pairs are followed breadth first and checked when found,
+    so the first difference is reached by a shortest string.
+    """
+    symbols = sorted(set().union(*transitions_table.values(), *other_transitions_table.values()))
+    successors, finals, (index, other_index) = _successors(
+        ((transitions_table, final_states), (other_transitions_table, other_final_states)), symbols)
+    parent = list(range(len(successors)))
+
+    def find(state: int) -> int:
+        while parent[state] != state:
+            parent[state] = parent[parent[state]]
+            state = parent[state]
+        return state
+
+    start = (index[start_state], other_index[other_start_state])
+    if finals[start[0]] != finals[start[1]]:
+        return ''
+    parent[start[1]] = start[0]
+    entries = [(-1, '')]
+    pairs = deque([(start, 0)])
+    while pairs:
+        (state, other_state), entry = pairs.popleft()
+        row, other_row = successors[state], successors[other_state]
+        for column, symbol in enumerate(symbols):
+            next_state, next_other_state = row[column], other_row[column]
+            root, other_root = find(next_state), find(next_other_state)
+            if root == other_root:
+                continue
+            parent[other_root] = root
+            entries.append((entry, symbol))
+            if finals[next_state] != finals[next_other_state]:
+                return _word(entries, len(entries) - 1)
+            pairs.append(((next_state, next_other_state), len(entries) - 1))
+    return None
+
+
+def dfa_inclusion_counterexample(transitions_table: Dict[str, Dict[str, str]], start_state: str, final_states: Iterable[str],
+                                 other_transitions_table: Dict[str, Dict[str, str]], other_start_state: str, other_final_states: Iterable[str]) -> Optional[str]:
+    """
+    Return a shortest string the other DFA accepts and the first DFA does not, None if the first DFA accepts every string the other accepts.
+    Inclusion is not symmetric, so pairs cannot be merged, the reachable pairs of states are followed breadth first, each once.
+    """
+    symbols = sorted(set().union(*transitions_table.values(), *other_transitions_table.values()))
+    successors, finals, (index, other_index) = _successors(
+        ((transitions_table, final_states), (other_transitions_table, other_final_states)), symbols)
+
+    start = (index[start_state], other_index[other_start_state])
+    if finals[start[1]] and not finals[start[0]]:
+        return ''
+    visited = {start}
+    entries = [(-1, '')]
+    pairs = deque([(start, 0)])
+    while pairs:
+        (state, other_state), entry = pairs.popleft()
+        row, other_row = successors[state], successors[other_state]
+        for column, symbol in enumerate(symbols):
+            pair = (row[column], other_row[column])
+            if pair in visited:
+                continue
+            visited.add(pair)
+            entries.append((entry, symbol))
+            if finals[pair[1]] and not finals[pair[0]]:
+                return _word(entries, len(entries) - 1)
+            pairs.append((pair, len(entries) - 1))
+    return None
+
+
+def nfa_inclusion_counterexample(including: BitNFA, transitions_table: Dict[str, Dict[str, Iterable[str]]], start_state: str, final_states: Iterable[str]) -> Optional[str]:
+    """
+    Return a shortest string the NFA of the transitions table accepts and the including NFA does not, None if there is none.
+    Only the including NFA is determinized, on the fly: the pairs (state of the other NFA, set of states of the including NFA)
+    are followed breadth first, and a pair is pruned if a pair of the same state with a subset of its states was found,
+    as every string accepted from it is accepted from the smaller one. The sets found for a state form an antichain.
+    Only the states with a symbol transition or final are kept, epsilon transitions are followed at once.
+    including: the NFA that should accept every string of the other
+    including type: BitNFA
+    transitions_table: the transitions of the other NFA, '$' is the epsilon symbol
+    transitions_table type: dict
+    start_state: the start state of the other NFA
+    start_state type: str
+    final_states: the final states of the other NFA
+    final_states type: iterable of str
+    """
+    final_states = set(final_states)
+    final = including.final_mask
+    # The sets keep only the states with a symbol transition or final, the others do not change what a set accepts.
+    paired = including.symbols_mask | final
+    closures = {}
+    steps = {}
+    # The minimal sets found for every state of the other NFA.
+    antichains = {}
+
+    def closure(state: str) -> FrozenSet[str]:
+        """Return the states of the epsilon closure of state that are paired."""
+        states = closures.get(state)
+        if states is None:
+            states = set()
+            seen = {state}
+            stack = [state]
+            while stack:
+                stateFrom = stack.pop()
+                transitions = transitions_table[stateFrom]
+                if stateFrom in final_states or any(symbol != '$' for symbol in transitions):
+                    states.add(stateFrom)
+                for stateTo in transitions.get('$', ()):
+                    if stateTo not in seen:
+                        seen.add(stateTo)
+                        stack.append(stateTo)
+            states = closures[state] = frozenset(states)
+        return states
+
+    def add(state: str, mask: int) -> bool:
+        antichain = antichains.setdefault(state, [])
+        for found in antichain:
+            if found & ~mask == 0:
+                return False
+        antichain[:] = [found for found in antichain if mask & ~found]
+        antichain.append(mask)
+        return True
+
+    entries = [(-1, '')]
+    pairs = deque()
+    mask = including.start_mask & paired
+    for state in closure(start_state):
+        if add(state, mask):
+            if state in final_states and not mask & final:
+                return ''
+            pairs.append((state, mask, 0))
+    while pairs:
+        state, mask, entry = pairs.popleft()
+        for symbol, statesTo in transitions_table[state].items():
+            if symbol == '$':
+                continue
+            next_mask = steps.get((mask, symbol))
+            if next_mask is None:
+                next_mask = steps[mask, symbol] = including.step(mask, symbol) & paired
+            for stateTo in statesTo:
+                for next_state in closure(stateTo):
+                    if add(next_state, next_mask):
+                        entries.append((entry, symbol))
+                        if next_state in final_states and not next_mask & final:
+                            return _word(entries, len(entries) - 1)
+                        pairs.append((next_state, next_mask, len(entries) - 1))
+    return None
@@ -0,0 +1,160 @@
+import json
+import os
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Mapping, TextIO, Tuple, Union
+from FiniteAutomata.exceptions.Exceptions import InvalidStateException
+
+
+FORMATS = ('dot', 'json')
+
+
+def symbol_ranges(symbols: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    Return the symbols as sorted ranges (first, last) of consecutive characters, '$' the epsilon symbol is kept alone.
+    symbols: the symbols of parallel edges
+    symbols type: iterable of str
+    """
+    ranges = []
+    for symbol in sorted(set(symbols)):
+        if (ranges and symbol != '$' and ranges[-1][1] != '$' and len(symbol) == 1 == len(ranges[-1][1])
+                and ord(symbol) == ord(ranges[-1][1]) + 1):
+            ranges[-1] = (ranges[-1][0], symbol)
+        else:
+            ranges.append((symbol, symbol))
+    return ranges
+
+
+def ranges_label(ranges: Iterable[Tuple[str, str]]) -> str:
+    """Return the label of symbol ranges, like 'a-z,0', a range of two symbols is written as both."""
+    parts = []
+    for first, last in ranges:
+        if first == last:
+            parts.append(first)
+        elif ord(last) == ord(first) + 1:
+            parts.append(f'{first},{last}')
+        else:
+            parts.append(f'{first}-{last}')
+    return ','.join(parts)
+
+
+def merged_edges(transitions_table: Mapping[str, Mapping[str, Union[str, Iterable[str]]]],
+                 states: Iterable[str]) -> Iterator[Tuple[str, str, List[Tuple[str, str]]]]:
+    """
+    Yield an edge (state from, state to, symbol ranges) for every pair of states of the view joined by some symbols,
+    the parallel edges of one symbol each are merged. Only the edges from and to states of the view are yielded.
+    transitions_table: DFA transitions, or NFA transitions to sets of states
+    transitions_table type: dict
+    states: the states of the view
+    states type: iterable of str
+    """
+    states = dict.fromkeys(states)
+    for stateFrom in states:
+        targets: Dict[str, List[str]] = {}
+        for symbol, statesTo in transitions_table[stateFrom].items():
+            for stateTo in (statesTo,) if isinstance(statesTo, str) else statesTo:
+                if stateTo in states:
+                    targets.setdefault(stateTo, []).append(symbol)
+        for stateTo, symbols in targets.items():
+            yield stateFrom, stateTo, symbol_ranges(symbols)
+
+
+def neighborhood(transitions_table: Mapping[str, Mapping[str, Union[str, Iterable[str]]]],
+                 states: Iterable[str], hops: int) -> Tuple[str, ...]:
+    """
+    Return the states reached from the given states by following at most hops edges, in breadth first order.
+    Only the states found are read, so the time does not depend on the size of the automaton.
+    transitions_table: DFA transitions, or NFA transitions to sets of states
+    transitions_table type: dict
+    states: the states the neighborhood is around
+    states type: iterable of str
+    hops: the most edges followed
+    hops type: int
+    """
+    if hops < 0:
+        raise ValueError(f"hops has to be at least 0. {hops} is not.")
+    found = dict.fromkeys(states)
+    for state in found:
+        if state not in transitions_table:
+            raise InvalidStateException(f"the state {state} is not valid")
+    queue = deque((state, 0) for state in found)
+    while queue:
+        state, distance = queue.popleft()
+        if distance == hops:
+            continue
+        for statesTo in transitions_table[state].values():
+            for stateTo in (statesTo,) if isinstance(statesTo, str) else statesTo:
+                if stateTo not in found:
+                    found[stateTo] = None
+                    queue.append((stateTo, distance + 1))
+    return tuple(found)
+
+
+def _dot_id(name: str) -> str:
+    return '"' + name.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _write_dot(file: TextIO, transitions_table: Mapping, start_state: str, final_states: Iterable[str], states: Iterable[str], name: str) -> None:
+    file.write(f'digraph {_dot_id(name)} {{\n\trankdir=LR\n')
+    file.write('\t"__start__" [shape=point]\n')
+    for state in states:
+        shape = 'doublecircle' if state in final_states else 'circle'
+        file.write(f'\t{_dot_id(state)} [shape={shape}]\n')
+    if start_state in states:
+        file.write(f'\t"__start__" -> {_dot_id(start_state)}\n')
+    for stateFrom, stateTo, ranges in merged_edges(transitions_table, states):
+        file.write(
+            f'\t{_dot_id(stateFrom)} -> {_dot_id(stateTo)} [label={_dot_id(ranges_label(ranges))}]\n')
+    file.write('}\n')
+
+
+def _write_json(file: TextIO, transitions_table: Mapping, start_state: str, final_states: Iterable[str], states: Iterable[str], name: str) -> None:
+    file.write(f'{{"name": {json.dumps(name)}, "start_state": {json.dumps(start_state)}, "states": [')
+    separator = ''
+    for state in states:
+        file.write(separator + json.dumps(
+            {'name': state, 'final': state in final_states}))
+        separator = ', '
+    file.write('], "edges": [')
+    separator = ''
+    for stateFrom, stateTo, ranges in merged_edges(transitions_table, states):
+        file.write(separator + json.dumps(
+            {'from': stateFrom, 'to': stateTo, 'symbols': ranges, 'label': ranges_label(ranges)}))
+        separator = ',\n'
+    file.write(']}\n')
+
+
+def export_graph(file: Union[str, os.PathLike, TextIO], transitions_table: Mapping[str, Mapping[str, Union[str, Iterable[str]]]],
+                 start_state: str, final_states: Iterable[str], states: Iterable[str], *, format: str = 'dot', name: str = 'FA') -> None:
+    """
+    Write the graph of the states of the view as DOT or JSON, line by line, without building it in memory.
+    Parallel edges are merged into one edge labeled with symbol ranges, and only the edges between states of the view are written,
+    so the time is that of the view, not of the whole automaton.
+    file: the path of the file, or a text file the graph is written to
+    file type: str, os.PathLike or text file
+    transitions_table: DFA transitions, or NFA transitions to sets of states
+    transitions_table type: dict
+    start_state: the start state, it is pointed at if it is in the view
+    start_state type: str
+    final_states: the final states
+    final_states type: iterable of str
+    states: the states of the view
+    states type: iterable of str
+    format: 'dot' or 'json'
+    format type: str
+    name: the name of the graph
+    name type: str
+    """
+    if format not in FORMATS:
+        raise ValueError(
+            f"format has to be one of {FORMATS}. {format} is not.")
+    states = tuple(dict.fromkeys(states))
+    for state in states:
+        if state not in transitions_table:
+            raise InvalidStateException(f"the state {state} is not valid")
+    write = _write_dot if format == 'dot' else _write_json
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'w', encoding='utf-8') as opened:
+            write(opened, transitions_table, start_state,
+                  final_states, states, name)
+    else:
+        write(file, transitions_table, start_state, final_states, states, name)
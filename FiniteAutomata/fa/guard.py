@@ -0,0 +1,64 @@
+from typing import Union
+from FiniteAutomata.exceptions.Exceptions import *
+from FiniteAutomata.fa.dfa import DFA
+from FiniteAutomata.fa.instrumentation import emit, hooks
+from FiniteAutomata.fa.lazy_dfa import LazyDFA
+from FiniteAutomata.fa.nfa import NFA
+
+
+FALLBACKS = ('lazy', 'nfa', None)
+
+
+def build_matcher(regex: str, *, construction: str = 'thompson', minimize: bool = False,
+                  max_states: int = None, max_memory: int = None, max_seconds: float = None,
+                  max_transitions: int = None, fallback: str = 'lazy') -> Union[DFA, LazyDFA, NFA]:
+    """
+    Return the DFA of the regex, or, if converting or minimizing exceeds a budget, a matcher that simulates the NFA.
+    Every returned matcher has check_string(input), which returns True first if the input is accepted,
+    so the cost of building is bounded whatever the regex.
+    regex: the regex that would be matched
+    regex type: str
+    construction: how the nfa of the regex is built, 'thompson' or 'glushkov', see NFA
+    construction type: str
+    minimize: minimize the DFA, within the same budget
+    minimize type: bool
+    max_states, max_memory, max_seconds: the budget of the DFA, see DFA. None for the class values DFA.max_states, DFA.max_memory and DFA.max_seconds,
+                                         max_states is 10000 if DFA.max_states is None too
+    max_states, max_memory type: int
+    max_seconds type: float
+    max_transitions: the most transitions of the position automaton, if it has more the Thompson NFA is built instead, see NFA.
+                     None for the class value NFA.max_transitions, 1000000 if it is None too
+    max_transitions type: int
+    fallback: the matcher returned when the budget is exceeded, 'lazy' for a LazyDFA with a cache of max_states states and max_memory bytes,
+              'nfa' for the NFA, whose check_string runs the bit-parallel simulation, or None to raise StateExplosionException
+    fallback type: str
+    """
+    if fallback not in FALLBACKS:
+        raise ValueError(
+            f"fallback has to be one of {FALLBACKS}. {fallback!r} is not.")
+    # The budgets set on the classes are used, the defaults only bound what neither sets.
+    if max_states is None:
+        max_states = DFA.max_states if DFA.max_states is not None else 10000
+    if max_transitions is None:
+        max_transitions = NFA.max_transitions if NFA.max_transitions is not None else 1000000
+    try:
+        nfa = NFA(regex, construction=construction,
+                  max_transitions=max_transitions)
+    except StateExplosionException as exception:
+        if fallback is None:
+            raise
+        if hooks:
+            emit('fallback', engine='thompson', reason=str(exception))
+        nfa = NFA(regex)
+    try:
+        dfa = DFA(nfa=nfa, max_states=max_states,
+                  max_memory=max_memory, max_seconds=max_seconds)
+        return dfa.minimize() if minimize else dfa
+    except StateExplosionException as exception:
+        if fallback is None:
+            raise
+        if hooks:
+            emit('fallback', engine=fallback, reason=str(exception))
+    if fallback == 'nfa':
+        return nfa
+    return LazyDFA(nfa=nfa, max_states=max_states, max_memory=max_memory)
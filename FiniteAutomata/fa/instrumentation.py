@@ -0,0 +1,70 @@
+from typing import Any, Callable, Dict, List, Tuple
+
+
+Hook = Callable[[str, Dict[str, Any]], None]
+
+# The instrumented code only checks that this list is not empty, so without hooks it costs one test per phase.
+# It is mutated in place, never rebound, as modules import it.
+hooks: List[Hook] = []
+
+
+def add_hook(hook: Hook) -> Hook:
+    """
+    Call the hook on every instrumentation event, hook(event, data), and return it.
+    Events and their data:
+        parse                seconds, length of the normalized regex, tokens of the postfix regex
+        thompson             seconds, states of the nfa
+        glushkov             seconds, states of the position automaton
+        subset_construction  seconds, dfa_states, epsilon_closures computed (one per distinct move)
+        minimize             seconds, rounds (splitters processed), states before, minimal_states
+        compile              seconds, states, table_bytes
+        match                engine ('dfa', 'compiled' or 'nfa'), steps (input symbols), accepted, dead
+        fallback             engine ('thompson', 'lazy' or 'nfa'), reason, build_matcher exceeded the position automaton or DFA budget
+    hook: the callback, it should be fast as it runs inside the instrumented call
+    hook type: callable
+    """
+    if not callable(hook):
+        raise TypeError(f"hook has to be callable. {hook} is not.")
+    hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook: Hook) -> None:
+    """Stop calling the hook, raise ValueError if it was not added."""
+    hooks.remove(hook)
+
+
+def emit(event: str, **data: Any) -> None:
+    """Call every hook on the event."""
+    for hook in tuple(hooks):
+        hook(event, data)
+
+
+class Recorder:
+    """Hook that keeps the events, use it as a context manager to record the events of a block."""
+
+    def __init__(self) -> None:
+        self.events: List[Tuple[str, Dict[str, Any]]] = []
+
+    def __call__(self, event: str, data: Dict[str, Any]) -> None:
+        self.events.append((event, data))
+
+    def __enter__(self):
+        return add_hook(self)
+
+    def __exit__(self, *exc_info) -> None:
+        remove_hook(self)
+
+    def clear(self) -> None:
+        self.events = []
+
+    def totals(self) -> Dict[str, Dict[str, Any]]:
+        """Return, for every event, the number of times it happened and the sum of its numeric data."""
+        totals = {}
+        for event, data in self.events:
+            total = totals.setdefault(event, {'count': 0})
+            total['count'] += 1
+            for name, value in data.items():
+                if isinstance(value, (int, float)):
+                    total[name] = total.get(name, 0) + value
+        return totals
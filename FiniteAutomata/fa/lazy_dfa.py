@@ -0,0 +1,138 @@
+import sys
+from collections import OrderedDict, namedtuple
+from typing import FrozenSet, Tuple
+from FiniteAutomata.exceptions.Exceptions import *
+from FiniteAutomata.fa.nfa import NFA
+
+
+LazyDFACacheInfo = namedtuple(
+    'LazyDFACacheInfo', ['hits', 'misses', 'evictions', 'fallbacks', 'states', 'memory'])
+
+
+class LazyDFA:
+    """DFA whose states are built from the NFA only when the input first reaches them, and kept in a bounded LRU cache."""
+
+    def __init__(self, *, regex: str = None, nfa: NFA = None,
+                 max_states: int = 10000,
+                 max_memory: int = None,
+                 min_chars_per_state: int = 10) -> None:
+        """
+        regex: the regex that would be matched
+        regex type: str
+        nfa: the nfa that would be matched
+        nfa type: NFA
+        max_states: the most DFA states kept in the cache
+        max_states type: int
+        max_memory: the most bytes the cached states may take, estimated, None for no limit
+        max_memory type: int
+        min_chars_per_state: if a string reads fewer characters than this per evicted state while the whole cache is replaced, the cache is thrashing and the rest of the string is matched by NFA simulation
+        min_chars_per_state type: int
+        """
+        if nfa:
+            self.nfa = nfa.copy()
+        elif regex:
+            self.nfa = NFA(regex)
+        else:
+            raise DFAInvalidArgumentsException(
+                "Input should be regex or NFA.")
+        if max_states < 1:
+            raise ValueError(
+                f"max_states has to be at least 1. {max_states} is not.")
+
+        self.max_states = max_states
+        self.max_memory = max_memory
+        self.min_chars_per_state = min_chars_per_state
+        self._row_size = sys.getsizeof(dict.fromkeys(self.nfa.symbols))
+        self._states_epsilon_closure = {}
+        self.clear_cache()
+        self.start_state = self._epsilon_closure(self.nfa.start_state)
+
+    def __repr__(self) -> str:
+        return f"LazyDFA('regex = {self.nfa.regex.expression}')"
+
+    def clear_cache(self) -> None:
+        """Drop every cached DFA state and reset the cache statistics."""
+        self._cache = OrderedDict()
+        self._memory = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._fallbacks = 0
+
+    def cache_info(self) -> LazyDFACacheInfo:
+        """Return the cache statistics."""
+        return LazyDFACacheInfo(self._hits, self._misses, self._evictions, self._fallbacks, len(self._cache), self._memory)
+
+    def _epsilon_closure(self, state: str) -> FrozenSet[str]:
+        closure = self._states_epsilon_closure.get(state)
+        if closure is None:
+            closure = self._states_epsilon_closure[state] = frozenset(
+                self.nfa.state_epsilon_closure(state))
+        return closure
+
+    def _move(self, DfaState: FrozenSet[str], symbol: str) -> FrozenSet[str]:
+        """Return the DFA state reached from DfaState by reading symbol."""
+        DfaStateTo = set()
+        for stateFrom in DfaState:
+            for stateTo in self.nfa.transitions_table[stateFrom].get(symbol, ()):
+                DfaStateTo.update(self._epsilon_closure(stateTo))
+        return frozenset(DfaStateTo)
+
+    def _transitions(self, DfaState: FrozenSet[str]) -> dict:
+        """Return the cached transitions of DfaState, adding the state and evicting the least recently used ones if needed."""
+        transitions = self._cache.get(DfaState)
+        if transitions is not None:
+            self._cache.move_to_end(DfaState)
+            return transitions
+
+        transitions = self._cache[DfaState] = {}
+        self._memory += sys.getsizeof(DfaState) + self._row_size
+        while len(self._cache) > self.max_states or (self.max_memory is not None and self._memory > self.max_memory and len(self._cache) > 1):
+            evicted, _ = self._cache.popitem(last=False)
+            self._memory -= sys.getsizeof(evicted) + self._row_size
+            self._evictions += 1
+        return transitions
+
+    def _simulate(self, DfaState: FrozenSet[str], input: str) -> FrozenSet[str]:
+        """Match the input by bit-parallel NFA simulation, without touching the cache."""
+        engine = self.nfa.compile()
+        return frozenset(engine.to_states(engine.run(engine.from_states(DfaState), input)))
+
+    def check_string(self, input: str) -> Tuple[bool, FrozenSet[str]]:
+        """
+        Return True if the input is accepted by the regex, and last NFA states the input reaches
+        input: the string that will be checked, if it is accepted by the regex
+        input type: str
+        """
+        if not isinstance(input, str):
+            raise TypeError(
+                f"input has to be a str. {input} is {type(input)}, not str.")
+
+        current_state = self.start_state
+        transitions = self._transitions(current_state)
+        evictions_mark, position_mark = self._evictions, 0
+        misses = 0
+        steps = len(input)
+        for position, c in enumerate(input):
+            next_state = transitions.get(c)
+            if next_state is None:
+                next_state = transitions[c] = self._move(current_state, c)
+                misses += 1
+            current_state = next_state
+            if not current_state:
+                steps = position + 1
+                break
+            transitions = self._transitions(current_state)
+
+            if self._evictions - evictions_mark >= self.max_states:
+                if position - position_mark < self.min_chars_per_state * self.max_states:
+                    self._fallbacks += 1
+                    steps = position + 1
+                    current_state = self._simulate(
+                        current_state, input[position + 1:])
+                    break
+                evictions_mark, position_mark = self._evictions, position
+
+        self._misses += misses
+        self._hits += steps - misses
+        return not self.nfa.final_states.isdisjoint(current_state), current_state
@@ -0,0 +1,185 @@
+import codecs
+from abc import ABC, abstractmethod
+import mmap
+import os
+from typing import Set, Tuple, TypeVar, Union
+from FiniteAutomata.fa.bit_nfa import BitNFA
+from FiniteAutomata.fa.compiled import CompiledDFA
+
+
+Matcher = TypeVar('Matcher')
+
+
+class Matcher(ABC):
+    """Incremental matcher, the input is fed in chunks of str or bytes and only the current state is kept."""
+
+    def __init__(self, *, encoding: str = 'utf-8') -> None:
+        """
+        encoding: the encoding bytes chunks are decoded with, a character split between two chunks is decoded once complete
+        encoding type: str
+        """
+        self.encoding = encoding
+        self.reset()
+
+    def reset(self) -> Matcher:
+        """Go back to the start state, as if nothing was fed."""
+        self._decoder = codecs.getincrementaldecoder(self.encoding)()
+        self._reset()
+        return self
+
+    def feed(self, chunk: Union[str, bytes]) -> Matcher:
+        """
+        Read the next chunk of the input.
+        chunk: the next part of the input
+        chunk type: str, bytes, bytearray or memoryview
+        """
+        self._feed(self._decode(chunk))
+        return self
+
+    def feed_until_accepted(self, chunk: Union[str, bytes]) -> bool:
+        """
+        Read the next chunk of the input up to the first accepted prefix, the rest of the chunk is dropped.
+        Return True if an accepted prefix was reached.
+        chunk: the next part of the input
+        chunk type: str, bytes, bytearray or memoryview
+        """
+        chunk = self._decode(chunk)
+        if self.accepted:
+            return True
+        self._feed_until_accepted(chunk)
+        return self.accepted
+
+    def finish(self) -> Matcher:
+        """Flush the bytes left in the decoder, raise UnicodeDecodeError if they are an incomplete character."""
+        self._feed(self._decoder.decode(b'', final=True))
+        return self
+
+    def _decode(self, chunk: Union[str, bytes]) -> str:
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            chunk = self._decoder.decode(chunk)
+        elif not isinstance(chunk, str):
+            raise TypeError(
+                f"chunk has to be a str or bytes. {chunk} is {type(chunk)}, not str or bytes.")
+        return chunk
+
+    @abstractmethod
+    def _reset(self) -> None:
+        """Go back to the start state."""
+
+    @abstractmethod
+    def _feed(self, chunk: str) -> None:
+        """Read a decoded chunk."""
+
+    @abstractmethod
+    def _feed_until_accepted(self, chunk: str) -> None:
+        """Read a decoded chunk up to the first accepted prefix."""
+
+    @property
+    @abstractmethod
+    def state(self) -> Union[str, Set[str]]:
+        """The current state, or set of states."""
+
+    @property
+    @abstractmethod
+    def accepted(self) -> bool:
+        """True if the input fed so far is accepted."""
+
+    @property
+    @abstractmethod
+    def dead(self) -> bool:
+        """True if no input can be accepted anymore."""
+
+
+class DFAMatcher(Matcher):
+    """Incremental matcher of a compiled DFA."""
+
+    def __init__(self, compiled: CompiledDFA, *, encoding: str = 'utf-8') -> None:
+        """
+        compiled: the compiled dfa the input is matched with
+        compiled type: CompiledDFA
+        encoding: the encoding bytes chunks are decoded with
+        encoding type: str
+        """
+        self.compiled = compiled
+        super().__init__(encoding=encoding)
+
+    def _reset(self) -> None:
+        self._row = self.compiled.start_row
+
+    def _feed(self, chunk: str) -> None:
+        self._row = self.compiled.run(self._row, chunk)
+
+    def _feed_until_accepted(self, chunk: str) -> None:
+        self._row = self.compiled.run_until_final(self._row, chunk)[0]
+
+    @property
+    def state(self) -> str:
+        return self.compiled.states[self._row]
+
+    @property
+    def accepted(self) -> bool:
+        return self.compiled.is_final(self._row)
+
+    @property
+    def dead(self) -> bool:
+        """True if no input can be accepted anymore."""
+        return self.compiled.is_dead(self._row)
+
+
+class NFAMatcher(Matcher):
+    """Incremental matcher of a bit-parallel NFA."""
+
+    def __init__(self, compiled: BitNFA, *, encoding: str = 'utf-8') -> None:
+        """
+        compiled: the bit-parallel nfa the input is matched with
+        compiled type: BitNFA
+        encoding: the encoding bytes chunks are decoded with
+        encoding type: str
+        """
+        self.compiled = compiled
+        super().__init__(encoding=encoding)
+
+    def _reset(self) -> None:
+        self._mask = self.compiled.start_mask
+
+    def _feed(self, chunk: str) -> None:
+        self._mask = self.compiled.run(self._mask, chunk)
+
+    def _feed_until_accepted(self, chunk: str) -> None:
+        self._mask = self.compiled.run_until_final(self._mask, chunk)[0]
+
+    @property
+    def state(self) -> Set[str]:
+        return self.compiled.to_states(self._mask)
+
+    @property
+    def accepted(self) -> bool:
+        return self._mask & self.compiled.final_mask != 0
+
+    @property
+    def dead(self) -> bool:
+        """True if no state is active, so no input can be accepted anymore."""
+        return self._mask == 0
+
+
+def match_file(matcher: Matcher, path: Union[str, os.PathLike], *, window: int = 1 << 20) -> Tuple[bool, Union[str, Set[str]]]:
+    """
+    Return True if the file content is accepted, and last state it reaches, like check_string.
+    The file is memory-mapped and fed to the matcher in windows, so memory does not grow with the file size.
+    matcher: the matcher the file is fed to, it is reset first
+    matcher type: Matcher
+    path: the path of the file
+    path type: str or os.PathLike
+    window: the number of bytes fed at once
+    window type: int
+    """
+    if window < 1:
+        raise ValueError(f"window has to be at least 1. {window} is not.")
+    matcher.reset()
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                for start in range(0, len(content), window):
+                    matcher.feed(content[start:start + window])
+    matcher.finish()
+    return matcher.accepted, matcher.state
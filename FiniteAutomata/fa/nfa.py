@@ -1,37 +1,128 @@
-import copy
-from typing import Set, Tuple, TypeVar
-from AlgebraicExpressionParser import Expression
+import asyncio
+import os
+from concurrent.futures import Executor
+from time import perf_counter
+from types import MappingProxyType
+from typing import AsyncIterable, Dict, FrozenSet, Iterable, Iterator, Mapping, Optional, Set, TextIO, Tuple, TypeVar, Union
 from FiniteAutomata.exceptions.Exceptions import *
+from FiniteAutomata.fa.bit_nfa import BitNFA
+from FiniteAutomata.fa.equivalence import nfa_inclusion_counterexample
+from FiniteAutomata.fa.export import export_graph, merged_edges, neighborhood, ranges_label
+from FiniteAutomata.fa.instrumentation import emit, hooks
+from FiniteAutomata.fa.matcher import NFAMatcher
+from FiniteAutomata.fa.regex import Regex, normalize
+from FiniteAutomata.fa.search import Searcher, reversed_bit_nfa
+from FiniteAutomata.fa.stream import match_stream
 from graphviz import Digraph
 
 
 NFA = TypeVar('NFA')
 
 
+CONSTRUCTIONS = ('thompson', 'glushkov')
+
+
 class NFA:
-    def __init__(self, regex: str) -> None:
+    """Immutable NFA of a regex, operations return new NFAs, so copy is free. The transitions table, states and symbols are read-only."""
+
+    # The most transitions of the position automaton, None for no limit.
+    max_transitions = None
+
+    def __init__(self, regex: str, *, construction: str = 'thompson', max_transitions: int = None) -> None:
         """
         regex: the regex that would be converted into nfa
         regex type: str
+        construction: 'thompson' for the Thompson NFA, with epsilon transitions and one final state,
+                      or 'glushkov' for the position automaton, without epsilon transitions and with a state per symbol of the regex, plus the start state.
+                      The position automaton can have quadratically many transitions: in a starred alternation of n words,
+                      like (abc+abd+...)*, the last position of every word is followed by the first of every word, n * n transitions
+        construction type: str
+        max_transitions: the most transitions the position automaton may have, exceeding it raises StateExplosionException,
+                         None for the class value NFA.max_transitions, itself None for no limit. The Thompson NFA is linear in the regex
+        max_transitions type: int
         """
-        self.regex = regex
+        if construction not in CONSTRUCTIONS:
+            raise ValueError(
+                f"construction has to be one of {CONSTRUCTIONS}. {construction!r} is not.")
+        self._construction = construction
+        if max_transitions is not None:
+            self.max_transitions = max_transitions
+        instrumented = bool(hooks)
+        if instrumented:
+            start = perf_counter()
+        self._regex = Regex(regex)
+        if instrumented:
+            emit('parse', seconds=perf_counter() - start,
+                 length=len(self._regex.expression), tokens=len(self._regex.postfix()))
+        if self.construction == 'glushkov':
+            self._construct_position_automaton()
+        else:
+            self._construct_transitions_table()
+
+    def _set_table(self, transitions_table: Dict[str, Dict[str, FrozenSet[str]]], start_state: str, final_states: Iterable[str], symbols: Iterable[str]) -> None:
+        """Set the automaton, the transitions table is owned by the NFA from now on."""
+        self._transitions_table = transitions_table
+        self._states = tuple(sorted(transitions_table.keys()))
+        self._symbols = frozenset(symbols)
+        self._start_state = start_state
+        self._final_states = frozenset(final_states)
+        self._view = None
+        self._compiled = None
 
     @property
-    def regex(self) -> Expression:
+    def regex(self) -> Regex:
         return self._regex
 
-    @regex.setter
-    def regex(self, regex: str) -> None:
-        regex = self._remove_spaces_from_string(regex)
-        regex = self._insert_concatenate_operator(regex)
-        self._regex = Expression(expression=regex, operators={
-            '+', '&', '*'}, operators_info={'+': (2, 1), '&': (2, 2), '*': (1, 3)}, operators_associativity={'+': 'LR', '&': 'LR', '*': 'LR'}, variables=self._get_regex_symbols(regex))
-        self._construct_transitions_table()
+    @property
+    def construction(self) -> str:
+        return self._construction
+
+    def __getstate__(self) -> dict:
+        """Pickle the NFA without its read-only view and compiled matcher, they are built again when used."""
+        state = dict(self.__dict__)
+        state['_view'] = None
+        state['_compiled'] = None
+        return state
+
+    @property
+    def transitions_table(self) -> Mapping[str, Mapping[str, FrozenSet[str]]]:
+        """Read-only view of the transitions, every state maps symbols to the frozenset of the next states, '$' is the epsilon symbol."""
+        if self._view is None:
+            self._view = MappingProxyType({state: MappingProxyType(transitions)
+                                           for state, transitions in self._transitions_table.items()})
+        return self._view
+
+    @property
+    def states(self) -> Tuple[str, ...]:
+        return self._states
+
+    @property
+    def symbols(self) -> FrozenSet[str]:
+        return self._symbols
+
+    @property
+    def start_state(self) -> str:
+        return self._start_state
+
+    @property
+    def final_state(self) -> Optional[str]:
+        """The final state of the Thompson NFA, None for the Glushkov NFA, see final_states."""
+        return self._final_state
+
+    @property
+    def final_states(self) -> FrozenSet[str]:
+        return self._final_states
 
     def __str__(self) -> str:
-        return f"< Symbols: {self.symbols}\n  States: {self.states}\n  Transitions Table: {self.transitions_table}\n  Start State: {self.start_state}\n  Final State: {self.final_state} >"
+        transitions_table = {state: {symbol: set(statesTo) for symbol, statesTo in transitions.items()}
+                             for state, transitions in self._transitions_table.items()}
+        if self.construction == 'glushkov':
+            return f"< Symbols: {set(self.symbols)}\n  States: {list(self.states)}\n  Transitions Table: {transitions_table}\n  Start State: {self.start_state}\n  Final States: {set(self.final_states)} >"
+        return f"< Symbols: {set(self.symbols)}\n  States: {list(self.states)}\n  Transitions Table: {transitions_table}\n  Start State: {self.start_state}\n  Final State: {self.final_state} >"
 
     def __repr__(self) -> str:
+        if self.construction == 'glushkov':
+            return f"NFA('{self.regex.expression}', construction='glushkov')"
         return f"NFA('{self.regex.expression}')"
 
     def __iter__(self):
@@ -39,107 +130,210 @@ class NFA:
             yield (state, transitions)
     
     def copy(self) -> NFA:
-        """Create a deep copy of the NFA."""
-        return self.__class__(self.regex.expression)
-
-    @staticmethod
-    def _remove_spaces_from_string(string: str) -> str:
-        string = string.replace("\n", "").replace(" ", "")
-        return string
-
-    @staticmethod
-    def _get_regex_symbols(regex: str) -> Set[str]:
-        operator = {'+', '&', '*'}
-        brackets = {'(', ')', '[', ']', '{', '}'}
-        symbols = set()
-        for c in regex:
-            if c not in operator and c not in brackets:
-                symbols.add(c)
-        return symbols
-
-    @staticmethod
-    def _insert(string: str, index: int, c: str) -> str:
-        return string[:index] + c + string[index:]
-
-    def _insert_concatenate_operator(self, regex: str) -> str:
-        """insert a concatenate operator's symbol between operands. Example: ab(a) -> a&b&(a)."""
-
-        symbols = self._get_regex_symbols(regex)
-        i = 0
-        while i < len(regex)-1:
-
-            if regex[i] in symbols and (regex[i+1] in symbols or regex[i+1] == '(' or regex[i+1] == '{' or regex[i+1] == '['):
-                regex = self._insert(
-                    regex, i+1, '&')
-
-            elif (regex[i] == ')' or regex[i] == '}' or regex[i] == ']') and (regex[i+1] in symbols or regex[i+1] == '(' or regex[i+1] == '{' or regex[i+1] == '['):
-                regex = self._insert(
-                    regex, i+1, '&')
-
-            elif regex[i] == '*' and (regex[i+1] in symbols or regex[i+1] == '(' or regex[i+1] == '{' or regex[i+1] == '['):
-                regex = self._insert(
-                    regex, i+1, '&')
-            i += 1
-        return regex
+        """Return the NFA itself, it is immutable."""
+        return self
+
+    @classmethod
+    def normalize_regex(cls, regex: str) -> str:
+        """Return the regex the way the NFA parses it, without spaces and with explicit concatenate operators."""
+        return normalize(regex)
 
     def _construct_transitions_table(self) -> None:
         """Construct NFA transitions table of Regex."""
-        postfix_regex = self.regex.postfix()
+        instrumented = bool(hooks)
+        if instrumented:
+            start = perf_counter()
+        # States are numbered with ints while building, and named by their numbers at the end.
         transitions = {}
         stack = []
         stateNo = 0
-        for token in postfix_regex:
+        for token in self.regex.postfix():
             if self.regex.is_operand(token):
-                stack.append((str(stateNo), str(stateNo+1)))
-                transitions.setdefault(str(stateNo), {}).setdefault(
-                    token, set()).add(str(stateNo+1))
+                stack.append((stateNo, stateNo+1))
+                transitions.setdefault(stateNo, {}).setdefault(
+                    token, set()).add(stateNo+1)
+                stateNo += 2
+            elif token == '&':
+                op2 = stack.pop()
+                op1 = stack.pop()
+                transitions.setdefault(op1[1], {}).setdefault(
+                    '$', set()).add(op2[0])
+                stack.append((op1[0], op2[1]))
+            elif token == '+':
+                op2 = stack.pop()
+                op1 = stack.pop()
+                transitions.setdefault(stateNo, {}).setdefault(
+                    '$', set()).update((op1[0], op2[0]))
+                transitions.setdefault(op1[1], {}).setdefault(
+                    '$', set()).add(stateNo+1)
+                transitions.setdefault(op2[1], {}).setdefault(
+                    '$', set()).add(stateNo+1)
+                stack.append((stateNo, stateNo+1))
                 stateNo += 2
             else:
-                if self.regex.is_binary_operator(token):
-                    op2 = stack[-1]
-                    stack.pop()
-                    op1 = stack[-1]
-                    stack.pop()
-                    if(token == '&'):
-                        transitions.setdefault(op1[1], {}).setdefault(
-                            '$', set()).add(op2[0])
-                        stack.append((op1[0], op2[1]))
-                    else:
-                        transitions.setdefault(str(stateNo), {}).setdefault(
-                            '$', set()).add(op1[0])
-                        transitions.setdefault(str(stateNo), {}).setdefault(
-                            '$', set()).add(op2[0])
-                        transitions.setdefault(op1[1], {}).setdefault(
-                            '$', set()).add(str(stateNo+1))
-                        transitions.setdefault(op2[1], {}).setdefault(
-                            '$', set()).add(str(stateNo+1))
-                        stack.append((str(stateNo), str(stateNo+1)))
-                        stateNo += 2
-                else:
-                    op1 = stack[-1]
-                    stack.pop()
-                    transitions.setdefault(str(stateNo), {}).setdefault(
-                        '$', set()).add(op1[0])
-                    transitions.setdefault(op1[1], {}).setdefault(
-                        '$', set()).add(str(stateNo+1))
-                    transitions.setdefault(op1[1], {}).setdefault(
-                        '$', set()).add(op1[0])
-                    transitions.setdefault(str(stateNo), {}).setdefault(
-                        '$', set()).add(str(stateNo+1))
-                    stack.append((str(stateNo), str(stateNo+1)))
-                    stateNo += 2
+                op1 = stack.pop()
+                transitions.setdefault(stateNo, {}).setdefault(
+                    '$', set()).add(op1[0])
+                transitions.setdefault(op1[1], {}).setdefault(
+                    '$', set()).update((stateNo+1, op1[0]))
+                transitions[stateNo]['$'].add(stateNo+1)
+                stack.append((stateNo, stateNo+1))
+                stateNo += 2
         transitions[stack[-1][1]] = {}
 
-        self.transitions_table = copy.deepcopy(transitions)
-        self.states = sorted(transitions.keys())
-        self.symbols = self.regex.get_operands()
-        self.symbols.add('$')
-        self.start_state = stack[-1][0]
-        self.final_state = stack[-1][1]
+        self._final_state = str(stack[-1][1])
+        self._set_table({str(stateFrom): {symbol: frozenset(map(str, statesTo)) for symbol, statesTo in stateTransitions.items()}
+                         for stateFrom, stateTransitions in transitions.items()},
+                        str(stack[-1][0]), (self._final_state,), self.regex.symbols | {'$'})
+        if instrumented:
+            emit('thompson', seconds=perf_counter() - start, states=len(self.states))
+
+    def _construct_position_automaton(self) -> None:
+        """
+        Construct the Glushkov NFA of Regex, the state of the i-th symbol of the regex is str(i) and the start state is '0'.
+        A state has a transition to every position that can follow it, on the symbol of that position.
+        """
+        instrumented = bool(hooks)
+        if instrumented:
+            start = perf_counter()
+        # Each operand on the stack is (nullable, first positions, last positions), sets are owned by one operand,
+        # so they are merged in place, the smaller into the larger.
+        def merge(positions1: Set[int], positions2: Set[int]) -> Set[int]:
+            if len(positions1) < len(positions2):
+                positions1, positions2 = positions2, positions1
+            positions1 |= positions2
+            return positions1
+
+        max_transitions = self.max_transitions
+        transitions = 0
+
+        def add_follow(positions: Set[int], first: Set[int]) -> None:
+            nonlocal transitions
+            for position in positions:
+                size = len(follow[position])
+                follow[position] |= first
+                transitions += len(follow[position]) - size
+                # Checked after every union, so at most one more set of first positions is built past the budget.
+                if max_transitions is not None and transitions > max_transitions:
+                    raise StateExplosionException(
+                        f"the position automaton has more than {max_transitions} transitions, the Thompson NFA is linear in the regex")
+
+        positions_symbols = [None]
+        follow = [set()]
+        stack = []
+        for token in self.regex.postfix():
+            if self.regex.is_operand(token):
+                position = len(positions_symbols)
+                positions_symbols.append(token)
+                follow.append(set())
+                stack.append((False, {position}, {position}))
+            elif token == '&':
+                nullable2, first2, last2 = stack.pop()
+                nullable1, first1, last1 = stack.pop()
+                add_follow(last1, first2)
+                stack.append((nullable1 and nullable2,
+                              merge(first1, first2) if nullable1 else first1,
+                              merge(last2, last1) if nullable2 else last2))
+            elif token == '+':
+                nullable2, first2, last2 = stack.pop()
+                nullable1, first1, last1 = stack.pop()
+                stack.append((nullable1 or nullable2, merge(first1, first2), merge(last1, last2)))
+            else:
+                _, first, last = stack.pop()
+                add_follow(last, first)
+                stack.append((True, first, last))
+        nullable, first, last = stack.pop()
+        follow[0] = first
+
+        transitions_table = {}
+        for stateFrom, positions in enumerate(follow):
+            transitions = {}
+            for position in sorted(positions):
+                transitions.setdefault(positions_symbols[position], []).append(str(position))
+            transitions_table[str(stateFrom)] = {symbol: frozenset(statesTo) for symbol, statesTo in transitions.items()}
+        final_states = {str(position) for position in last}
+        if nullable:
+            final_states.add('0')
+        self._final_state = None
+        self._set_table(transitions_table, '0', final_states, self.regex.symbols)
+        if instrumented:
+            emit('glushkov', seconds=perf_counter() - start, states=len(self.states))
+
+    def compile(self) -> BitNFA:
+        """Return the bit-parallel simulation of the NFA, built once and reused by check_string."""
+        if self._compiled is None:
+            self._compiled = BitNFA.from_nfa(self)
+        return self._compiled
+
+    def matcher(self, *, encoding: str = 'utf-8') -> NFAMatcher:
+        """
+        Return an incremental matcher, the input is fed to it in chunks.
+        encoding: the encoding bytes chunks are decoded with
+        encoding type: str
+        """
+        return NFAMatcher(self.compile(), encoding=encoding)
+
+    async def check_stream(self, stream: Union[asyncio.StreamReader, AsyncIterable[Union[str, bytes]]], *, encoding: str = 'utf-8',
+                           read_size: int = 1 << 16, offload_size: int = 1 << 18, executor: Executor = None,
+                           stop_when_dead: bool = True, stop_when_accepted: bool = False) -> Tuple[bool, Set[str]]:
+        """
+        Return True if the stream content is accepted by the regex, and last state it reaches, see match_stream.
+        The chunks are matched as they arrive, without blocking the event loop, and reading stops early once the stream is decided.
+        stream: an asyncio.StreamReader or an async iterable of str or bytes chunks
+        stream type: asyncio.StreamReader or async iterable
+        encoding: the encoding bytes chunks are decoded with
+        encoding type: str
+        read_size: the most bytes read from a stream reader at once
+        read_size type: int
+        offload_size: the length from which a chunk is matched in the executor
+        offload_size type: int
+        executor: the executor long chunks are matched in, the default executor of the event loop if None
+        executor type: concurrent.futures.Executor
+        stop_when_dead: stop reading once no input can be accepted anymore
+        stop_when_dead type: bool
+        stop_when_accepted: stop reading at the first accepted prefix
+        stop_when_accepted type: bool
+        """
+        return await match_stream(self.matcher(encoding=encoding), stream, read_size=read_size, offload_size=offload_size,
+                                  executor=executor, stop_when_dead=stop_when_dead, stop_when_accepted=stop_when_accepted)
+
+    def searcher(self) -> Searcher:
+        """Return a searcher of the regex matches inside texts, reuse it to search many texts."""
+        return Searcher(self.compile(), reversed_bit_nfa(self._transitions_table, self.start_state, self.final_states))
+
+    def search(self, text: str, pos: int = 0) -> Optional[Tuple[int, int]]:
+        """
+        Return the start and end of the leftmost-longest match of the regex in text[pos:], None if there is none.
+        text: the text that will be searched
+        text type: str
+        pos: the index the search starts at
+        pos type: int
+        """
+        return self.searcher().search(text, pos)
+
+    def finditer(self, text: str, pos: int = 0) -> Iterator[Tuple[int, int]]:
+        """
+        Return an iterator over the start and end of the non-overlapping leftmost-longest matches of the regex in text[pos:].
+        text: the text that will be searched
+        text type: str
+        pos: the index the search starts at
+        pos type: int
+        """
+        return self.searcher().finditer(text, pos)
+
+    def count(self, text: str, pos: int = 0) -> int:
+        """
+        Return the number of the non-overlapping leftmost-longest matches of the regex in text[pos:].
+        text: the text that will be searched
+        text type: str
+        pos: the index the search starts at
+        pos type: int
+        """
+        return self.searcher().count(text, pos)
 
     def closure(self) -> NFA:
         """Return NFA that accepts the regex repeated zero or more times."""
-        return NFA(f"({self.regex.expression})*")
+        return NFA(f"({self.regex.expression})*", construction=self.construction, max_transitions=self.max_transitions)
 
     def union(self, regex: str) -> NFA:
         """
@@ -150,7 +344,7 @@ class NFA:
         if not isinstance(regex, str):
             raise TypeError(
                 f"regex has to be a str. {regex} is {type(regex)}, not str.")
-        return NFA(f"({self.regex.expression})+({regex})")
+        return NFA(f"({self.regex.expression})+({regex})", construction=self.construction, max_transitions=self.max_transitions)
 
     def concatenate(self, regex: str) -> NFA:
         """
@@ -161,7 +355,35 @@ class NFA:
         if not isinstance(regex, str):
             raise TypeError(
                 f"regex has to be a str. {regex} is {type(regex)}, not str.")
-        return NFA(f"({self.regex.expression})({regex})")
+        return NFA(f"({self.regex.expression})({regex})", construction=self.construction, max_transitions=self.max_transitions)
+
+    def includes(self, other: NFA) -> Tuple[bool, Optional[str]]:
+        """
+        Return True if this NFA accepts every string the other NFA accepts, else False and a shortest string only the other accepts.
+        This NFA is determinized on the fly and pruned with antichains, the other is not determinized, see nfa_inclusion_counterexample.
+        other: the NFA whose strings should be accepted
+        other type: NFA
+        """
+        if not isinstance(other, NFA):
+            raise TypeError(
+                f"other has to be a NFA. {other} is {type(other)}, not NFA.")
+        counterexample = nfa_inclusion_counterexample(
+            self.compile(), other._transitions_table, other.start_state, other.final_states)
+        return counterexample is None, counterexample
+
+    def equivalent(self, other: NFA) -> Tuple[bool, Optional[str]]:
+        """
+        Return True if both NFAs accept the same strings, else False and a shortest string only one of them accepts.
+        other: the NFA compared with this NFA
+        other type: NFA
+        """
+        included, counterexample = self.includes(other)
+        other_included, other_counterexample = other.includes(self)
+        if included and other_included:
+            return True, None
+        if included or (not other_included and len(other_counterexample) < len(counterexample)):
+            return False, other_counterexample
+        return False, counterexample
 
     def state_epsilon_closure(self, state: str) -> Set[str]:
         """
@@ -172,7 +394,7 @@ class NFA:
         if not isinstance(state, str):
             raise TypeError(
                 f"state has to be a str. {state} is {type(state)}, not str.")
-        if state not in self.states:
+        if state not in self._transitions_table:
             raise InvalidStateException(f"the state{state} is not valid")
         states = set()
         stack = [state]
@@ -181,7 +403,7 @@ class NFA:
             if stack_top not in states:
                 states.add(stack_top)
                 stack.extend(
-                    self.transitions_table[stack_top].setdefault('$', set()))
+                    self._transitions_table[stack_top].get('$', ()))
         return states
 
     def check_string(self, input: str) -> Tuple[bool, set]:
@@ -194,19 +416,55 @@ class NFA:
             raise TypeError(
                 f"input has to be a str. {input} is {type(input)}, not str.")
                 
-        current_states = self.state_epsilon_closure(self.start_state)
+        return self.compile().check_string(input)
 
-        for c in input:
-            next_states = set()
-
-            for state in current_states:
-                next_states.update(
-                    self.transitions_table[state].setdefault(c, set()))
-            for state in next_states.copy():
-                next_states.update(self.state_epsilon_closure(state))
-            current_states = next_states
+    def neighborhood(self, state: str, hops: int = 1) -> Tuple[str, ...]:
+        """
+        Return the states reached from state by following at most hops transitions, in breadth first order.
+        Only the states found are read, so a small view of a large NFA is found quickly.
+        state: the state the neighborhood is around
+        state type: str
+        hops: the most transitions followed
+        hops type: int
+        """
+        if not isinstance(state, str):
+            raise TypeError(
+                f"state has to be a str. {state} is {type(state)}, not str.")
+        return neighborhood(self._transitions_table, (state,), hops)
 
-        return self.final_state in current_states, current_states
+    def trace(self, input: str) -> Tuple[str, ...]:
+        """
+        Return the states check_string goes through for the input, epsilon closures included, in order of first visit.
+        input: the string that is checked
+        input type: str
+        """
+        if not isinstance(input, str):
+            raise TypeError(
+                f"input has to be a str. {input} is {type(input)}, not str.")
+        compiled = self.compile()
+        mask = visited = compiled.start_mask
+        states = list(compiled.to_states(mask))
+        for c in input:
+            if not mask:
+                break
+            mask = compiled.step(mask, c)
+            states.extend(compiled.to_states(mask & ~visited))
+            visited |= mask
+        return tuple(states)
+
+    def export(self, file: Union[str, os.PathLike, TextIO], *, format: str = 'dot', states: Iterable[str] = None) -> None:
+        """
+        Write the NFA graph as DOT or JSON, line by line, without building a Digraph in memory.
+        Parallel transitions are merged into one edge labeled with symbol ranges, like 'a-z'.
+        file: the path of the file, or a text file the graph is written to
+        file type: str, os.PathLike or text file
+        format: 'dot' or 'json'
+        format type: str
+        states: the states of the view written, like neighborhood or trace, all states if None
+        states type: iterable of str
+        """
+        export_graph(file, self._transitions_table, self.start_state, self.final_states,
+                     self.states if states is None else states, format=format, name='NFA Graph')
 
     def visualize(self, *, filename: str = 'nfa-graph',
                   format: str = 'png',
@@ -218,7 +476,9 @@ class NFA:
                   subgroup_color: str = "#A8A8A8",
                   bgcolor: str = "#FFFFFF",
                   arrow_color: str = "#000000",
-                  fontcolor: str = "#000000") -> Digraph:
+                  fontcolor: str = "#000000",
+                  states: Iterable[str] = None,
+                  render: bool = True) -> Digraph:
         """
         Return NFA graph.
         filename: name of file of nfa graph
@@ -241,6 +501,10 @@ class NFA:
         arrow_color type: str of hex or color name
         fontcolor: color of font in the graph
         fontcolor type: str of hex or color name
+        states: the states of the view drawn, like neighborhood or trace, all states if None
+        states type: iterable of str
+        render: if False the graph is only returned, not rendered to a file
+        render type: bool
         """
 
         graph = Digraph('NFA Graph')
@@ -250,11 +514,14 @@ class NFA:
 
         graph.node('Initial', shape='point',
                    color=state_color, fontcolor=fontcolor)
-        for state in self.states:
-            if state == self.final_state and state in subgroup_states:
+        states = self.states if states is None else tuple(dict.fromkeys(states))
+        for state in states:
+            if state not in self._transitions_table:
+                raise InvalidStateException(f"the state {state} is not valid")
+            if state in self.final_states and state in subgroup_states:
                 graph.node(state, shape='doublecircle',
                            color=state_color, fillcolor=subgroup_color, style='filled', fontcolor=fontcolor)
-            elif state == self.final_state:
+            elif state in self.final_states:
                 graph.node(state, shape='doublecircle',
                            color=state_color, fontcolor=fontcolor)
             elif state in subgroup_states:
@@ -264,13 +531,14 @@ class NFA:
                 graph.node(state, shape='circle',
                            color=state_color, fontcolor=fontcolor)
 
-        for stateFrom in self.transitions_table.keys():
-            for symbol in self.transitions_table[stateFrom].keys():
-                for stateTo in self.transitions_table[stateFrom][symbol]:
-                    graph.edge(stateFrom, stateTo,
-                               label=symbol, color=arrow_color, fontcolor=fontcolor)
-        graph.edge('Initial', self.start_state, color=arrow_color)
+        for stateFrom, stateTo, ranges in merged_edges(self._transitions_table, states):
+            graph.edge(stateFrom, stateTo, label=ranges_label(ranges),
+                       color=arrow_color, fontcolor=fontcolor)
+        if self.start_state in states:
+            graph.edge('Initial', self.start_state, color=arrow_color)
 
+        if not render:
+            return graph
         if view:
             graph.render(filename=filename, format=format,
                          directory=path, view=True)
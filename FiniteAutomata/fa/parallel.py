@@ -0,0 +1,266 @@
+import os
+from array import array
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+from FiniteAutomata.fa.compiled import CompiledDFA
+
+
+# Tables up to this number of entries are copied into a tuple by each worker, as indexing a tuple is faster than indexing
+# the shared buffer, larger tables are read in place.
+_COPIED_ENTRIES = 1 << 16
+
+
+def _run_from_all(table: Sequence[int], width: int, columns: Sequence[int], starts: List[int]) -> List[int]:
+    """
+    Return the state each start state reaches by reading the columns.
+    The runs are read in blocks, after each block runs that reached the same state are merged,
+    and the block grows while no runs merge. Runs in a state every symbol leads back to are done.
+    """
+    sinks = {state for state in range(0, len(table), width)
+             if all(to == state for to in table[state:state + width])}
+    distinct = list(dict.fromkeys(starts))
+    positions = {state: position for position, state in enumerate(distinct)}
+    index = [positions[state] for state in starts]
+    position, block = 0, 64
+    while position < len(columns):
+        columns_block = columns[position:position + block]
+        ends = []
+        for state in distinct:
+            if state not in sinks:
+                for column in columns_block:
+                    state = table[state + column]
+            ends.append(state)
+        position += block
+        merged = {}
+        remap = [merged.setdefault(state, len(merged)) for state in ends]
+        if len(merged) == len(distinct):
+            block = min(2 * block, 1 << 20)
+        distinct = list(merged)
+        index = [remap[i] for i in index]
+    return [distinct[i] for i in index]
+
+
+def _chunk_mapping(table_name: str, table_size: int, columns: Dict[str, int], input_name: str, itemsize: int,
+                   start: int, stop: int, starts: List[int]) -> List[int]:
+    """
+    Return the state each start state reaches by reading the chunk [start, stop) of the shared text.
+    The chunk is encoded into columns here, so the encoding is split between the workers too.
+    """
+    table_memory = shared_memory.SharedMemory(name=table_name)
+    input_memory = shared_memory.SharedMemory(name=input_name)
+    table_view = table_ints = matcher = None
+    try:
+        with input_memory.buf[start * itemsize:stop * itemsize] as text:
+            chunk = str(text, 'latin-1' if itemsize == 1 else 'utf-32-le')
+        table_view = table_memory.buf[:table_size * 4]
+        table_ints = table_view.cast('i')
+        table = tuple(table_ints) if table_size <= _COPIED_ENTRIES else table_ints
+        matcher = CompiledDFA.__new__(CompiledDFA)
+        matcher._initialize((), columns, table, 0, b'')
+        encoded = matcher._encode(chunk)
+        if not isinstance(encoded, bytes):
+            encoded = list(encoded)
+        return _run_from_all(table, matcher._width, encoded, starts)
+    finally:
+        # The views of the shared table are released before it is closed.
+        del matcher
+        table = None
+        if table_ints is not None:
+            table_ints.release()
+        if table_view is not None:
+            table_view.release()
+        table_memory.close()
+        input_memory.close()
+
+
+class SharedTable:
+    """Transition table of a compiled DFA copied once into shared memory, workers attach to it by name."""
+
+    def __init__(self, compiled: CompiledDFA) -> None:
+        """
+        compiled: the compiled dfa whose table is shared
+        compiled type: CompiledDFA
+        """
+        table = array('i', compiled._table)
+        self.size = len(table)
+        self.memory = shared_memory.SharedMemory(
+            create=True, size=max(table.itemsize * len(table), 1))
+        self.memory.buf[:table.itemsize * len(table)] = table.tobytes()
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def close(self) -> None:
+        """Free the shared memory."""
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def check_string_parallel(compiled: CompiledDFA, input: str, *, processes: int = None, executor: Executor = None, min_chunk: int = 1 << 16) -> Tuple[bool, str]:
+    """
+    Return True if the input is accepted, and last state the input reaches, like check_string.
+    The input is split into one chunk per process. Every chunk, but the first, is read from every state in parallel,
+    which gives the state each state leads to, and these mappings are composed in order.
+    The work of a chunk is its length times the number of runs from different states that have not met yet,
+    so it pays off for DFAs whose runs meet quickly, as those of most regexes do.
+    compiled: the compiled dfa
+    compiled type: CompiledDFA
+    input: the string that will be checked
+    input type: str
+    processes: the number of chunks and worker processes, the number of CPUs if None
+    processes type: int
+    executor: the process pool the chunks are run in, a new one is used if None
+    executor type: concurrent.futures.Executor
+    min_chunk: the input is checked serially if chunks would be shorter than this
+    min_chunk type: int
+    """
+    if not isinstance(input, str):
+        raise TypeError(
+            f"input has to be a str. {input} is {type(input)}, not str.")
+    processes = processes or os.cpu_count() or 1
+    if processes < 2 or len(input) < 2 * min_chunk:
+        return compiled.match(input)
+    processes = min(processes, len(input) // min_chunk)
+
+    # The raw text is shared, one byte per character if it fits, and each worker encodes its own chunk.
+    try:
+        text = input.encode('latin-1')
+    except UnicodeEncodeError:
+        text = input.encode('utf-32-le')
+    itemsize = len(text) // len(input)
+    width = compiled._width
+    bounds = [len(input) * chunk // processes for chunk in range(processes + 1)]
+    all_starts = list(range(0, len(compiled.states) * width, width))
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(processes)
+    input_memory = shared_memory.SharedMemory(create=True, size=len(text))
+    try:
+        input_memory.buf[:len(text)] = text
+        with SharedTable(compiled) as table:
+            futures = [executor.submit(_chunk_mapping, table.name, table.size, compiled._columns, input_memory.name, itemsize,
+                                       bounds[chunk], bounds[chunk + 1], [compiled._start] if chunk == 0 else all_starts)
+                       for chunk in range(processes)]
+            state = futures[0].result()[0]
+            for future in futures[1:]:
+                state = future.result()[state // width]
+    finally:
+        input_memory.close()
+        input_memory.unlink()
+        if own_executor:
+            executor.shutdown()
+
+    row = state // width
+    return compiled.is_final(row), compiled.states[row]
+
+
+# The matcher of a MatcherPool worker process, its table is the shared memory of the pool.
+_worker_memory = None
+_worker_matcher = None
+
+
+def _attach_matcher(table_name: str, table_size: int, columns: Dict[str, int], start: int, accepting: bytes) -> None:
+    """Set the matcher of the worker process over the shared table, without copying it."""
+    global _worker_memory, _worker_matcher
+    _worker_memory = shared_memory.SharedMemory(name=table_name)
+    _worker_matcher = CompiledDFA.__new__(CompiledDFA)
+    table = _worker_memory.buf[:table_size * 4].cast('i')
+    if table_size <= _COPIED_ENTRIES:
+        table = tuple(table)
+    # The states names stay in the pool process, workers return rows.
+    _worker_matcher._initialize((), columns, table, start, accepting)
+
+
+def _match_batch(strings: List[str]) -> array:
+    """Return the row every string of the batch reaches."""
+    matcher = _worker_matcher
+    return array('i', [matcher._run(matcher._start, input) // matcher._width for input in strings])
+
+
+class MatcherPool:
+    """
+    Process pool that matches batches of strings against one compiled DFA.
+    The transition table is put into shared memory once and every worker reads it in place,
+    so the automaton is stored once whatever the number of processes, only small tables are copied by the workers.
+    """
+
+    def __init__(self, compiled: CompiledDFA, *, processes: int = None, batch_size: int = 1024, max_pending: int = None) -> None:
+        """
+        compiled: the compiled dfa the strings are matched against
+        compiled type: CompiledDFA
+        processes: the number of worker processes, the number of CPUs if None
+        processes type: int
+        batch_size: the number of strings sent to a worker at once
+        batch_size type: int
+        max_pending: the most batches submitted and not yet consumed, reading the strings waits for the oldest batch beyond it, 2 per process if None
+        max_pending type: int
+        """
+        if batch_size < 1:
+            raise ValueError(
+                f"batch_size has to be at least 1. {batch_size} is not.")
+        self.compiled = compiled
+        self.processes = processes or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.max_pending = max_pending or 2 * self.processes
+        self._table = SharedTable(compiled)
+        try:
+            self._executor = ProcessPoolExecutor(self.processes, initializer=_attach_matcher, initargs=(
+                self._table.name, self._table.size, compiled._columns, compiled._start, compiled._accepting))
+        except BaseException:
+            self._table.close()
+            raise
+
+    def __repr__(self) -> str:
+        return f"MatcherPool({self.compiled!r}, processes={self.processes})"
+
+    def imap(self, strings: Iterable[str]) -> Iterator[Tuple[bool, str]]:
+        """
+        Yield for every string, in order, True if it is accepted, and the last state it reaches, like CompiledDFA.match.
+        The strings are read lazily, at most max_pending batches ahead of the results consumed.
+        A string with a symbol outside the alphabet raises KeyError when its result is reached.
+        strings: the strings that will be checked
+        strings type: iterable of str
+        """
+        states, accepting = self.compiled.states, self.compiled._accepting
+        strings = iter(strings)
+        pending = deque()
+        while True:
+            while len(pending) < self.max_pending:
+                batch = list(islice(strings, self.batch_size))
+                if not batch:
+                    break
+                for input in batch:
+                    if not isinstance(input, str):
+                        raise TypeError(
+                            f"input has to be a str. {input} is {type(input)}, not str.")
+                pending.append(self._executor.submit(_match_batch, batch))
+            if not pending:
+                return
+            for row in pending.popleft().result():
+                yield accepting[row] == 1, states[row]
+
+    def map(self, strings: Iterable[str]) -> List[Tuple[bool, str]]:
+        """Return the results of imap as a list."""
+        return list(self.imap(strings))
+
+    def close(self) -> None:
+        """Stop the worker processes and free the shared memory."""
+        self._executor.shutdown()
+        self._table.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
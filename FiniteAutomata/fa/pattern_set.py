@@ -0,0 +1,76 @@
+from typing import FrozenSet, Iterable, List
+from FiniteAutomata.fa.compiled import CompiledDFA
+from FiniteAutomata.fa.dfa import subset_construction
+from FiniteAutomata.fa.nfa import NFA
+from FiniteAutomata.fa.regex import symbol_classes
+
+
+class PatternSet:
+    """Many regexes compiled into one DFA, whose states carry the indexes of the regexes they accept."""
+
+    def __init__(self, regexes: Iterable[str]) -> None:
+        """
+        regexes: the regexes that would be matched together, a regex is identified by its index
+        regexes type: iterable of str
+        """
+        self.regexes = tuple(regexes)
+        if not self.regexes:
+            raise ValueError("regexes has to have at least one regex.")
+
+        # The union of the NFAs: their states are prefixed by the regex index,
+        # and a new start state has an epsilon transition to every NFA start state.
+        transitions_table = {'^': {'$': set()}}
+        final_states = {}
+        symbols = set()
+        nfas = [NFA(regex) for regex in self.regexes]
+        for index, nfa in enumerate(nfas):
+            prefix = f"{index}:"
+            for stateFrom, transitions in nfa.transitions_table.items():
+                transitions_table[prefix + stateFrom] = {symbol: {prefix + stateTo for stateTo in statesTo}
+                                                         for symbol, statesTo in transitions.items()}
+            transitions_table['^']['$'].add(prefix + nfa.start_state)
+            for state in nfa.final_states:
+                final_states[prefix + state] = index
+            symbols.update(nfa.symbols)
+        symbols.discard('$')
+
+        # A symbol can replace another of its class in every regex, so the DFA reads the classes, one column each.
+        DFA_States, DFA_States_Transitions, columns = subset_construction(
+            transitions_table, '^', sorted(symbols), symbol_classes(nfa.regex for nfa in nfas))
+        # The dead state is the row after the subsets.
+        dead = len(DFA_States)
+        self._accepts = [frozenset(final_states[state] for state in DfaState if state in final_states)
+                         for DfaState in DFA_States]
+        self._accepts.append(frozenset())
+        table = [number if number != -1 else dead
+                 for transitions in DFA_States_Transitions for number in transitions]
+        table.extend([dead] * (max(columns.values(), default=-1) + 1))
+        self.compiled = CompiledDFA(states=tuple(str(number) for number in range(dead + 1)),
+                                    columns=columns,
+                                    table=table, start=0, accepting=[bool(accepts) for accepts in self._accepts])
+
+    def __repr__(self) -> str:
+        return f"PatternSet({list(self.regexes)})"
+
+    def __len__(self) -> int:
+        return len(self.regexes)
+
+    def match(self, input: str) -> FrozenSet[int]:
+        """
+        Return the indexes of the regexes that accept the input, the input is read once whatever the number of regexes.
+        input: the string that will be checked
+        input type: str
+        """
+        if not isinstance(input, str):
+            raise TypeError(
+                f"input has to be a str. {input} is {type(input)}, not str.")
+        return self._accepts[self.compiled.run(self.compiled.start_row, input)]
+
+    def match_many(self, strings: Iterable[str]) -> List[FrozenSet[int]]:
+        """
+        Return for every string the indexes of the regexes that accept it.
+        strings: the strings that will be checked
+        strings type: iterable of str
+        """
+        _, final_states = self.compiled.check_many(strings)
+        return [self._accepts[row] for row in final_states.tolist()]
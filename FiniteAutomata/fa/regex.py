@@ -0,0 +1,228 @@
+from collections import namedtuple
+from typing import Dict, FrozenSet, Iterable, List, Set
+from FiniteAutomata.exceptions.Exceptions import *
+
+
+# The operators and their precedence, '&' is the concatenate operator and '*' is unary.
+OPERATORS = {'+': 1, '&': 2, '*': 3}
+BRACKETS = {'(': ')', '[': ']', '{': '}'}
+CLOSE_BRACKETS = {')', ']', '}'}
+IGNORED = {' ', '\n'}
+
+# A node of the regex tree, token is the symbol or the operator, and operands its children.
+Node = namedtuple('Node', ['token', 'operands'])
+
+
+def _is_symbol(c: str) -> bool:
+    return c not in OPERATORS and c not in BRACKETS and c not in CLOSE_BRACKETS
+
+
+def normalize(regex: str) -> str:
+    """Return the regex without spaces and with explicit concatenate operators, without validating it. Example: ab(a) -> a&b&(a)."""
+    normalized = []
+    previous_operand = False
+    for c in regex:
+        if c in IGNORED:
+            continue
+        if previous_operand and (c in BRACKETS or _is_symbol(c)):
+            normalized.append('&')
+        normalized.append(c)
+        previous_operand = c == '*' or c in CLOSE_BRACKETS or _is_symbol(c)
+    return ''.join(normalized)
+
+
+def symbol_classes(regexes: Iterable['Regex']) -> Dict[str, int]:
+    """
+    Return the class of every symbol of the regexes, symbols are in the same class if they are in the same charsets of every regex.
+    Replacing a symbol by another of its class does not change whether a string is accepted,
+    so automata can read the classes instead of the symbols. Classes are numbered in the order of their smallest symbol.
+    regexes: the parsed regexes
+    regexes type: iterable of Regex
+    """
+    signatures = {}
+    charset_id = 0
+    for regex in regexes:
+        for symbol in regex.symbols:
+            signatures.setdefault(symbol, [])
+        for charset in regex.charsets():
+            for symbol in charset:
+                signatures[symbol].append(charset_id)
+            charset_id += 1
+    classes = {}
+    signatures_classes = {}
+    for symbol in sorted(signatures):
+        classes[symbol] = signatures_classes.setdefault(
+            tuple(signatures[symbol]), len(signatures_classes))
+    return classes
+
+
+class Regex:
+    """
+    Regex parsed in one pass, linear in its length.
+    Symbols are all characters but the operators '+' (union), '&' (concatenate) and '*' (closure), brackets, spaces and new lines.
+    Concatenation is implicit between operands, binary operators are right associative.
+    """
+
+    __slots__ = ('_expression', '_postfix', '_tree', '_symbols')
+
+    def __init__(self, regex: str) -> None:
+        """
+        regex: the regex that will be parsed, InvalidRegexException gives the position of the first error
+        regex type: str
+        """
+        if not isinstance(regex, str):
+            raise TypeError(
+                f"regex has to be a str. {regex} is {type(regex)}, not str.")
+        expression = []
+        postfix = []
+        nodes = []
+        # Binary operators and open brackets, with their positions.
+        operators = []
+        symbols = set()
+
+        def reduce() -> None:
+            operator = operators.pop()[0]
+            postfix.append(operator)
+            right = nodes.pop()
+            nodes.append(Node(operator, (nodes.pop(), right)))
+
+        def push_operator(operator: str, position: int) -> None:
+            while operators and operators[-1][0] in OPERATORS and OPERATORS[operators[-1][0]] > OPERATORS[operator]:
+                reduce()
+            operators.append((operator, position))
+            expression.append(operator)
+
+        previous_operand = False
+        for position, c in enumerate(regex):
+            if c in IGNORED:
+                continue
+            if c in BRACKETS or _is_symbol(c):
+                if previous_operand:
+                    push_operator('&', position)
+                expression.append(c)
+                if c in BRACKETS:
+                    operators.append((c, position))
+                    previous_operand = False
+                else:
+                    symbols.add(c)
+                    postfix.append(c)
+                    nodes.append(Node(c, ()))
+                    previous_operand = True
+            elif c in CLOSE_BRACKETS:
+                if not previous_operand:
+                    raise InvalidRegexException(
+                        f"expected a symbol or an open bracket before '{c}' at position {position} of {regex!r}.")
+                while operators and operators[-1][0] in OPERATORS:
+                    reduce()
+                if not operators:
+                    raise InvalidRegexException(
+                        f"'{c}' at position {position} of {regex!r} has no open bracket.")
+                bracket, bracket_position = operators.pop()
+                if BRACKETS[bracket] != c:
+                    raise InvalidRegexException(
+                        f"'{c}' at position {position} of {regex!r} does not close '{bracket}' at position {bracket_position}.")
+                expression.append(c)
+            elif c == '*':
+                if not previous_operand:
+                    raise InvalidRegexException(
+                        f"'*' at position {position} of {regex!r} has nothing to repeat.")
+                postfix.append(c)
+                nodes.append(Node(c, (nodes.pop(),)))
+                expression.append(c)
+            else:
+                if not previous_operand:
+                    raise InvalidRegexException(
+                        f"'{c}' at position {position} of {regex!r} has no left operand.")
+                push_operator(c, position)
+                previous_operand = False
+
+        if not previous_operand:
+            raise InvalidRegexException(
+                f"expected a symbol or an open bracket at the end of {regex!r}, position {len(regex)}.")
+        while operators:
+            if operators[-1][0] in BRACKETS:
+                bracket, bracket_position = operators[-1]
+                raise InvalidRegexException(
+                    f"'{bracket}' at position {bracket_position} of {regex!r} is not closed.")
+            reduce()
+
+        self._expression = ''.join(expression)
+        self._postfix = postfix
+        self._tree = nodes.pop()
+        self._symbols = frozenset(symbols)
+
+    def __str__(self) -> str:
+        return self._expression
+
+    def __repr__(self) -> str:
+        return f"Regex('{self._expression}')"
+
+    @property
+    def expression(self) -> str:
+        """The regex without spaces and with explicit concatenate operators."""
+        return self._expression
+
+    @property
+    def tree(self) -> Node:
+        """The root of the regex tree."""
+        return self._tree
+
+    @property
+    def symbols(self) -> FrozenSet[str]:
+        return self._symbols
+
+    def postfix(self) -> List[str]:
+        """Return the postfix form of the regex."""
+        return list(self._postfix)
+
+    def charsets(self) -> List[Set[str]]:
+        """
+        Return the symbols of every largest union of single symbols in the regex, like (a+b+c),
+        and a set of one symbol for every other symbol of the regex. A symbol of the string is read by one of them.
+        """
+        charsets = []
+        # Each operand is the set of symbols of a union of single symbols, or None.
+        stack = []
+        for token in self._postfix:
+            if token in self._symbols:
+                stack.append({token})
+            elif token == '+':
+                right = stack.pop()
+                left = stack.pop()
+                if left is not None and right is not None:
+                    if len(left) < len(right):
+                        left, right = right, left
+                    left |= right
+                    stack.append(left)
+                else:
+                    charsets.extend(
+                        operand for operand in (left, right) if operand is not None)
+                    stack.append(None)
+            else:
+                operands = (stack.pop(),) if token == '*' else (
+                    stack.pop(), stack.pop())
+                charsets.extend(
+                    operand for operand in operands if operand is not None)
+                stack.append(None)
+        if stack[-1] is not None:
+            charsets.append(stack[-1])
+        return charsets
+
+    def symbol_classes(self) -> Dict[str, int]:
+        """Return the class of every symbol of the regex, see symbol_classes."""
+        return symbol_classes((self,))
+
+    def get_operands(self) -> Set[str]:
+        """Return set that contains all symbols in the regex."""
+        return set(self._symbols)
+
+    def is_operand(self, token: str) -> bool:
+        return token in self._symbols
+
+    @staticmethod
+    def is_binary_operator(token: str) -> bool:
+        return token == '+' or token == '&'
+
+    @staticmethod
+    def is_unary_operator(token: str) -> bool:
+        return token == '*'
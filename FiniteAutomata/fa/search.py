@@ -0,0 +1,132 @@
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+from FiniteAutomata.fa.bit_nfa import BitNFA
+from FiniteAutomata.fa.compiled import CompiledDFA
+
+
+def reversed_bit_nfa(transitions_table: Dict[str, dict], start_state: str, final_states: Iterable[str]) -> BitNFA:
+    """
+    Return the bit-parallel NFA of the reversed automaton, it accepts the reversed strings the automaton accepts.
+    transitions_table: dfa transitions (each value is a state) or nfa transitions (each value is a set of states)
+    transitions_table type: dict
+    start_state: the start state of the automaton
+    start_state type: str
+    final_states: the final states of the automaton
+    final_states type: iterable of str
+    """
+    reversed_start = '^'
+    while reversed_start in transitions_table:
+        reversed_start += '^'
+    reversed_table = {state: {} for state in transitions_table}
+    for stateFrom, transitions in transitions_table.items():
+        for symbol, statesTo in transitions.items():
+            for stateTo in (statesTo,) if isinstance(statesTo, str) else statesTo:
+                reversed_table[stateTo].setdefault(
+                    symbol, set()).add(stateFrom)
+    reversed_table[reversed_start] = {'$': set(final_states)}
+    return BitNFA(transitions_table=reversed_table, start_state=reversed_start, final_states={start_state})
+
+
+class Searcher:
+    """Leftmost-longest search of the matches of an automaton inside a text."""
+
+    def __init__(self, forward: Union[CompiledDFA, BitNFA], reverse: BitNFA, *, max_states: int = 10000) -> None:
+        """
+        forward: the automaton, it finds where a match ends
+        forward type: CompiledDFA or BitNFA
+        reverse: the reversed automaton, it finds where matches start
+        reverse type: BitNFA
+        max_states: the most states of the reverse DFA, built while reading, kept before it is dropped and built again
+        max_states type: int
+        """
+        self.forward = forward
+        self.reverse = reverse
+        self.max_states = max_states
+        self._clear()
+
+    def _clear(self) -> None:
+        self._masks = []
+        self._masks_ids = {}
+        self._transitions = []
+
+    def _state_id(self, mask: int) -> int:
+        state_id = self._masks_ids.get(mask)
+        if state_id is None:
+            state_id = self._masks_ids[mask] = len(self._masks)
+            self._masks.append(mask)
+            self._transitions.append({})
+        return state_id
+
+    def _match_starts(self, text: str, pos: int) -> bytearray:
+        """
+        Return one flag per index of the text from pos on, 1 if a match starts at the index.
+        The text is read backward by the reverse DFA, restarted at every index, and its states are built lazily.
+        """
+        reverse = self.reverse
+        start, final = reverse.start_mask, reverse.final_mask
+        starts = bytearray(len(text) + 1)
+        starts[len(text)] = start & final != 0
+        state_id = self._state_id(start)
+        for position in range(len(text) - 1, pos - 1, -1):
+            c = text[position]
+            next_state_id = self._transitions[state_id].get(c)
+            if next_state_id is None:
+                mask = reverse.step(self._masks[state_id], c) | start
+                if len(self._masks) >= self.max_states:
+                    current_mask = self._masks[state_id]
+                    self._clear()
+                    state_id = self._state_id(current_mask)
+                next_state_id = self._transitions[state_id][c] = self._state_id(
+                    mask)
+            state_id = next_state_id
+            if self._masks[state_id] & final:
+                starts[position] = 1
+        return starts
+
+    def _matches(self, text: str, pos: int) -> Iterator[Tuple[int, int]]:
+        starts = self._match_starts(text, pos)
+        # Forward scans past a match are kept, so a later scan over the same pairs stops at once and the search stays linear.
+        explored = {}
+        while pos <= len(text):
+            start = starts.find(1, pos)
+            if start == -1:
+                return
+            end = self.forward.longest_match(text, start, explored)
+            yield start, end
+            pos = end if end > start else end + 1
+
+    def search(self, text: str, pos: int = 0) -> Optional[Tuple[int, int]]:
+        """
+        Return the start and end of the leftmost-longest match in text[pos:], None if there is none.
+        text: the text that will be searched
+        text type: str
+        pos: the index the search starts at
+        pos type: int
+        """
+        if not isinstance(text, str):
+            raise TypeError(
+                f"text has to be a str. {text} is {type(text)}, not str.")
+        return next(self._matches(text, pos), None)
+
+    def finditer(self, text: str, pos: int = 0) -> Iterator[Tuple[int, int]]:
+        """
+        Return an iterator over the start and end of the non-overlapping leftmost-longest matches in text[pos:].
+        After an empty match the search goes on from the next index.
+        text: the text that will be searched
+        text type: str
+        pos: the index the search starts at
+        pos type: int
+        """
+        if not isinstance(text, str):
+            raise TypeError(
+                f"text has to be a str. {text} is {type(text)}, not str.")
+        return self._matches(text, pos)
+
+    def count(self, text: str, pos: int = 0) -> int:
+        """
+        Return the number of the non-overlapping leftmost-longest matches in text[pos:].
+        text: the text that will be searched
+        text type: str
+        pos: the index the search starts at
+        pos type: int
+        """
+        return sum(1 for _ in self.finditer(text, pos))
@@ -0,0 +1,65 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import AsyncIterable, AsyncIterator, Set, Tuple, Union
+from FiniteAutomata.fa.matcher import Matcher
+
+
+async def _chunks(stream: Union[asyncio.StreamReader, AsyncIterable[Union[str, bytes]]], read_size: int) -> AsyncIterator[Union[str, bytes]]:
+    """Yield the chunks of an async iterable, or of a stream reader read read_size bytes at a time."""
+    if isinstance(stream, asyncio.StreamReader):
+        while True:
+            chunk = await stream.read(read_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        async for chunk in stream:
+            yield chunk
+
+
+async def match_stream(matcher: Matcher, stream: Union[asyncio.StreamReader, AsyncIterable[Union[str, bytes]]], *,
+                       read_size: int = 1 << 16, offload_size: int = 1 << 18, executor: Executor = None,
+                       stop_when_dead: bool = True, stop_when_accepted: bool = False) -> Tuple[bool, Union[str, Set[str]]]:
+    """
+    Return True if the stream content is accepted, and last state it reaches, like check_string.
+    The chunks are fed to the matcher as they arrive, and the event loop runs other tasks between two chunks,
+    chunks of offload_size or more are fed in an executor, so the event loop is never blocked by a long chunk.
+    Reading stops early, leaving the rest of the stream unread, once no input can be accepted anymore if stop_when_dead,
+    and at the first accepted prefix if stop_when_accepted.
+    matcher: the matcher the stream is fed to, it is reset first
+    matcher type: Matcher
+    stream: the stream, an asyncio.StreamReader or an async iterable of str or bytes chunks
+    stream type: asyncio.StreamReader or async iterable
+    read_size: the most bytes read from a stream reader at once
+    read_size type: int
+    offload_size: the length from which a chunk is fed in the executor
+    offload_size type: int
+    executor: the executor long chunks are fed in, the default executor of the event loop if None
+    executor type: concurrent.futures.Executor
+    stop_when_dead: stop reading once the matcher is dead, the stream is rejected
+    stop_when_dead type: bool
+    stop_when_accepted: stop reading at the first accepted prefix, the stream is accepted
+    stop_when_accepted type: bool
+    """
+    if read_size < 1:
+        raise ValueError(
+            f"read_size has to be at least 1. {read_size} is not.")
+    loop = asyncio.get_running_loop()
+    feed = matcher.feed_until_accepted if stop_when_accepted else matcher.feed
+    matcher.reset()
+    if stop_when_accepted and matcher.accepted:
+        return matcher.accepted, matcher.state
+    chunks = _chunks(stream, read_size)
+    try:
+        async for chunk in chunks:
+            if len(chunk) >= offload_size:
+                await loop.run_in_executor(executor, feed, chunk)
+            else:
+                feed(chunk)
+                await asyncio.sleep(0)
+            if (stop_when_dead and matcher.dead) or (stop_when_accepted and matcher.accepted):
+                return matcher.accepted, matcher.state
+    finally:
+        await chunks.aclose()
+    matcher.finish()
+    return matcher.accepted, matcher.state
@@ -0,0 +1,32 @@
+"""Time DFA.minimize on DFAs of growing size and print how the time scales.
+
+The family (a+b)*a(a+b)^n(a+b)* determinizes to about 2^(n+1) states that
+minimize to n+3, so every run does real splitting work.
+
+    python -m benchmarks.minimize [max_n]
+"""
+import math
+import sys
+import time
+
+from FiniteAutomata import DFA
+
+
+def minimize_family(n: int) -> str:
+    return '(a+b)*a' + '(a+b)' * n + '(a+b)*'
+
+
+def main(max_n: int = 12) -> None:
+    print(f"{'n':>3} {'states':>8} {'minimal':>8} {'seconds':>10} {'us/(N*log2 N)':>14}")
+    for n in range(2, max_n + 1):
+        dfa = DFA(regex=minimize_family(n))
+        start = time.perf_counter()
+        minimal = dfa.minimize()
+        seconds = time.perf_counter() - start
+        size = len(dfa.states) * len(dfa.symbols)
+        print(f"{n:>3} {len(dfa.states):>8} {len(minimal.states):>8} {seconds:>10.4f} "
+              f"{seconds * 1e6 / (size * math.log2(size)):>14.3f}")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
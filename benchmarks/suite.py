@@ -0,0 +1,195 @@
+"""Time the hot paths over generated regex families and compare the results with a baseline.
+
+Timed operations, on every size of every family:
+    nfa_construct   NFA(regex), the Thompson NFA of the regex
+    dfa_convert     DFA(nfa=nfa), converting a built NFA
+    minimize        DFA.minimize
+    nfa_compile     BitNFA.from_nfa, the bit-parallel simulation the first NFA.check_string builds
+    nfa_check       NFA.check_string, on inputs of growing length
+    dfa_check       DFA.check_string, on inputs of growing length
+
+Constructions are timed on new automata, so the automata that are matched are the ones users get.
+
+Each time is the best of a few repeats. Results are written as JSON, and
+compared with a baseline written by an earlier run: an operation that is
+slower than the baseline by more than the threshold is a regression, and the
+exit status is 1.
+
+    python -m benchmarks.suite [--quick] [--output FILE] [--baseline FILE] [--threshold RATIO]
+"""
+import argparse
+import json
+import platform
+import random
+import string
+import sys
+import time
+from typing import Callable, Dict, Iterator, List
+
+from FiniteAutomata import DFA, NFA, BitNFA
+
+
+def alternation(n: int) -> str:
+    """n distinct three-letter words joined by +, starred so inputs of any length can match."""
+    letters = string.ascii_lowercase
+    words = (letters[i // 676 % 26] + letters[i // 26 % 26] + letters[i % 26] for i in range(n))
+    return '(' + '+'.join(words) + ')*'
+
+
+def nested_stars(n: int) -> str:
+    """n nested starred groups, ((a*b)*a)*... ."""
+    regex = 'a'
+    for depth in range(n):
+        regex = f"({regex}*{'ba'[depth % 2]})"
+    return regex + '*'
+
+
+def blowup(n: int) -> str:
+    """(a+b)*a(a+b)^n, its DFA has 2^(n+1) states."""
+    return '(a+b)*a' + '(a+b)' * n
+
+
+FAMILIES = {
+    'alternation': (alternation, [10, 100, 1000]),
+    'nested_stars': (nested_stars, [5, 20, 80]),
+    'blowup': (blowup, [4, 8, 12]),
+}
+QUICK_FAMILIES = {
+    'alternation': (alternation, [10, 100]),
+    'nested_stars': (nested_stars, [5, 20]),
+    'blowup': (blowup, [4, 8]),
+}
+INPUT_SIZES = [1000, 10000, 100000]
+QUICK_INPUT_SIZES = [1000, 10000]
+
+
+def best_time(function: Callable[[], object], *, repeat: int = 5, min_time: float = 0.05) -> float:
+    """Return the best time of one call of the function, calls are looped until a measure takes min_time."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+    times = [elapsed]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append(time.perf_counter() - start)
+    return min(times) / number
+
+
+def random_input(dfa: DFA, size: int, seed: int) -> str:
+    """A string of the dfa symbols, walking from the start state and preferring the symbols that keep out of dead states."""
+    rng = random.Random(seed)
+    compiled = dfa.compile()
+    rows = {state: row for row, state in enumerate(compiled.states)}
+    state = dfa.start_state
+    chars = []
+    for _ in range(size):
+        symbols = [symbol for symbol, stateTo in dfa.transitions_table[state].items()
+                   if not compiled.is_dead(rows[stateTo])] or sorted(dfa.symbols)
+        c = rng.choice(symbols)
+        chars.append(c)
+        state = dfa.transitions_table[state][c]
+    return ''.join(chars)
+
+
+def run_family(family: str, regex: str, n: int, input_sizes: List[int]) -> Iterator[Dict]:
+    nfa = NFA(regex)
+    dfa = DFA(nfa=nfa)
+    info = {'family': family, 'n': n, 'nfa_states': len(nfa.states),
+            'dfa_states': len(dfa.states)}
+    yield dict(info, operation='nfa_construct', input_size=0,
+               seconds=best_time(lambda: NFA(regex)))
+    yield dict(info, operation='dfa_convert', input_size=0,
+               seconds=best_time(lambda: DFA(nfa=nfa)))
+    yield dict(info, operation='minimize', input_size=0, seconds=best_time(dfa.minimize))
+    yield dict(info, operation='nfa_compile', input_size=0,
+               seconds=best_time(lambda: BitNFA.from_nfa(nfa)))
+    for size in input_sizes:
+        input = random_input(dfa, size, seed=n)
+        # nfa_compile times the first call, the check is timed on the compiled simulation.
+        nfa.check_string(input)
+        yield dict(info, operation='nfa_check', input_size=size,
+                   seconds=best_time(lambda: nfa.check_string(input)))
+        yield dict(info, operation='dfa_check', input_size=size,
+                   seconds=best_time(lambda: dfa.check_string(input)))
+
+
+def run(families: Dict, input_sizes: List[int]) -> Dict:
+    results = []
+    for family, (generate, sizes) in families.items():
+        for n in sizes:
+            for result in run_family(family, generate(n), n, input_sizes):
+                results.append(result)
+                print(f"{result['family']:>12} {result['n']:>5} {result['operation']:>13} "
+                      f"{result['input_size']:>7} {result['seconds']:>12.6f}", flush=True)
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'results': results,
+    }
+
+
+def key(result: Dict) -> str:
+    return f"{result['family']}/{result['n']}/{result['operation']}/{result['input_size']}"
+
+
+def compare(report: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Print the time ratios to the baseline and return the keys of the regressions."""
+    baseline_times = {key(result): result['seconds']
+                      for result in baseline['results']}
+    regressions = []
+    print(f"\n{'benchmark':>40} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for result in report['results']:
+        old = baseline_times.get(key(result))
+        if old is None:
+            continue
+        ratio = result['seconds'] / old if old else float('inf')
+        flag = ''
+        if ratio > threshold:
+            regressions.append(key(result))
+            flag = '  REGRESSION'
+        print(f"{key(result):>40} {old:>12.6f} {result['seconds']:>12.6f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true',
+                        help='smaller sizes, for a fast check')
+    parser.add_argument('--output', default='benchmark-results.json',
+                        help='the JSON file the results are written to')
+    parser.add_argument('--baseline',
+                        help='a JSON file of earlier results to compare with')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='the slowdown ratio reported as a regression')
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        report = run(QUICK_FAMILIES, QUICK_INPUT_SIZES)
+    else:
+        report = run(FAMILIES, INPUT_SIZES)
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressions over {args.threshold}x")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
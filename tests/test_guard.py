@@ -0,0 +1,32 @@
+import unittest
+
+from FiniteAutomata import DFA, LazyDFA, build_matcher
+from FiniteAutomata.exceptions.Exceptions import StateExplosionException
+
+
+class BuildMatcherBudgetTest(unittest.TestCase):
+    """'(a+b)*a(a+b)^n' needs 2^(n+1) DFA states."""
+
+    regex = '(a+b)*a' + '(a+b)' * 6
+
+    def tearDown(self) -> None:
+        DFA.max_states = None
+
+    def test_class_budget_is_used(self) -> None:
+        DFA.max_states = 20
+        with self.assertRaises(StateExplosionException):
+            build_matcher(self.regex, fallback=None)
+        matcher = build_matcher(self.regex)
+        self.assertIsInstance(matcher, LazyDFA)
+        self.assertEqual(matcher.max_states, 20)
+
+    def test_argument_overrides_class_budget(self) -> None:
+        DFA.max_states = 20
+        self.assertIsInstance(build_matcher(self.regex, max_states=1000, fallback=None), DFA)
+
+    def test_default_budget(self) -> None:
+        self.assertIsInstance(build_matcher(self.regex, fallback=None), DFA)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+
+from FiniteAutomata import DFA, NFA, PatternSet, Recorder, build_matcher
+
+
+class InstrumentationTest(unittest.TestCase):
+    """Every instrumented phase runs with a hook registered."""
+
+    def test_recorded_pipeline(self) -> None:
+        with Recorder() as recorder:
+            DFA(regex='(a+b)*abb').minimize().compile().match('ababb')
+            NFA('(a+b)*abb', construction='glushkov').check_string('ababb')
+            PatternSet(['ab', 'a*b']).match('ab')
+            build_matcher('(a+b)*a' + '(a+b)' * 12, max_states=100, fallback='lazy')
+        totals = recorder.totals()
+        for event in ('parse', 'thompson', 'glushkov', 'subset_construction', 'minimize', 'compile', 'match', 'fallback'):
+            self.assertIn(event, totals)
+        self.assertGreater(totals['subset_construction']['dfa_states'], 0)
+        self.assertGreater(totals['subset_construction']['epsilon_closures'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
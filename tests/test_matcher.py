@@ -0,0 +1,32 @@
+import unittest
+
+from FiniteAutomata import DFA, NFA
+
+
+class FeedUntilAcceptedTest(unittest.TestCase):
+    """The rest of a chunk after the first accepted prefix is dropped, unknown symbols in it included."""
+
+    def test_rest_of_chunk_is_not_read(self) -> None:
+        for automaton in (DFA(regex='a*b'), NFA('a*b')):
+            matcher = automaton.matcher()
+            self.assertTrue(matcher.feed_until_accepted('aab\n'))
+            self.assertTrue(matcher.accepted)
+            self.assertTrue(matcher.feed_until_accepted('\n'))
+
+    def test_chunks_before_acceptance(self) -> None:
+        for automaton in (DFA(regex='a*b'), NFA('a*b')):
+            matcher = automaton.matcher()
+            self.assertFalse(matcher.feed_until_accepted(b'aa'))
+            self.assertTrue(matcher.feed_until_accepted(b'abb!'))
+
+    def test_unknown_symbol_before_acceptance(self) -> None:
+        matcher = DFA(regex='a*b').matcher()
+        with self.assertRaises(KeyError):
+            matcher.feed_until_accepted('a\nb')
+        matcher = NFA('a*b').matcher()
+        self.assertFalse(matcher.feed_until_accepted('a\nb'))
+        self.assertTrue(matcher.dead)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import copy
+import pickle
+import unittest
+
+from FiniteAutomata import DFA, NFA
+
+
+class PickleTest(unittest.TestCase):
+    """Automata pickle after their read-only views and compiled matchers are built."""
+
+    def test_dfa_round_trip(self) -> None:
+        dfa = DFA(regex='(a+b)*abb', max_states=100)
+        dfa.transitions_table
+        dfa.check_many(['abb', 'ab'])
+        for loaded in (pickle.loads(pickle.dumps(dfa)), copy.deepcopy(dfa)):
+            self.assertEqual(loaded.transitions_table, dfa.transitions_table)
+            self.assertEqual(loaded.start_state, dfa.start_state)
+            self.assertEqual(loaded.final_states, dfa.final_states)
+            self.assertEqual(loaded.max_states, 100)
+            self.assertEqual(loaded.compile().match('babb'), dfa.compile().match('babb'))
+
+    def test_nfa_round_trip(self) -> None:
+        nfa = NFA('(a+b)*abb')
+        nfa.transitions_table
+        nfa.check_string('abb')
+        for loaded in (pickle.loads(pickle.dumps(nfa)), copy.deepcopy(nfa)):
+            self.assertEqual(loaded.transitions_table, nfa.transitions_table)
+            self.assertEqual(loaded.check_string('babb'), nfa.check_string('babb'))
+            self.assertEqual(loaded.check_string('bab'), nfa.check_string('bab'))
+
+
+if __name__ == '__main__':
+    unittest.main()
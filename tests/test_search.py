@@ -0,0 +1,47 @@
+import unittest
+
+from FiniteAutomata import DFA, NFA
+
+
+class CountingText(str):
+    """A text that counts the symbols the automata read from it."""
+
+    reads = 0
+
+    def __getitem__(self, index):
+        CountingText.reads += 1
+        return str.__getitem__(self, index)
+
+
+def symbols_read(automaton, text: str) -> int:
+    CountingText.reads = 0
+    automaton.count(CountingText(text))
+    return CountingText.reads
+
+
+class SearchStepsTest(unittest.TestCase):
+    """'a+a*b' matches every 'a' of 'a' * n, and each forward scan looks for a 'b' up to the end of the text."""
+
+    def assert_linear(self, automaton) -> None:
+        small, large = 5000, 20000
+        self.assertEqual(automaton.count('a' * small), small)
+        small_reads = symbols_read(automaton, 'a' * small)
+        large_reads = symbols_read(automaton, 'a' * large)
+        # Linear reads grow 4 times, quadratic reads 16 times.
+        self.assertLess(large_reads, 5 * small_reads)
+        self.assertLess(large_reads, 5 * large)
+
+    def test_dfa_count_is_linear(self) -> None:
+        self.assert_linear(DFA(regex='a+a*b'))
+
+    def test_nfa_count_is_linear(self) -> None:
+        self.assert_linear(NFA('a+a*b'))
+
+    def test_matches(self) -> None:
+        for automaton in (DFA(regex='a+a*b'), NFA('a+a*b')):
+            self.assertEqual(list(automaton.finditer('aab' + 'a' * 3 + 'cab')),
+                             [(0, 3), (3, 4), (4, 5), (5, 6), (7, 9)])
+
+
+if __name__ == '__main__':
+    unittest.main()